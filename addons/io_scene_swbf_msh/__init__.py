@@ -52,160 +52,19 @@ if "bpy" in locals():
     reload_package(locals())
 # End of stuff taken from glTF
 
-import bpy
-from bpy_extras.io_utils import ExportHelper, ImportHelper
-from bpy.props import BoolProperty, EnumProperty, CollectionProperty
-from bpy.types import Operator, Menu
-from .msh_scene_utilities import create_scene, set_scene_animation
-from .msh_scene_save import save_scene
-from .msh_scene_read import read_scene
-from .msh_material_properties import *
-from .msh_skeleton_properties import *
-from .msh_collision_prim_properties import *
-from .msh_material_operators import *
-from .msh_scene_to_blend import *
-from .msh_anim_to_blend import *
-from .zaa_to_blend import *
-
-
-class ExportMSH(Operator, ExportHelper):
-    """ Export the current scene as a SWBF .msh file. """
-
-    bl_idname = "swbf_msh.export"
-    bl_label = "Export SWBF .msh File"
-    filename_ext = ".msh"
-
-    filter_glob: StringProperty(
-        default="*.msh",
-        options={'HIDDEN'},
-        maxlen=255,  # Max internal buffer length, longer would be clamped.
-    )
-
-    generate_triangle_strips: BoolProperty(
-        name="Generate Triangle Strips",
-        description="Triangle strip generation can be slow for meshes with thousands of faces "
-                    "and is off by default to enable fast mesh iteration.\n\n"
-                    "In order to improve runtime performance and reduce munged model size you are "
-                    "**strongly** advised to turn it on for your 'final' export!",
-        default=False
-    )
-
-    export_target: EnumProperty(name="Export Target",
-                                description="What to export.",
-                                items=(
-                                    ('SCENE', "Scene", "Export the current active scene."),
-                                    ('SELECTED', "Selected", "Export the currently selected objects and their parents."),
-                                    ('SELECTED_WITH_CHILDREN', "Selected with Children", "Export the currently selected objects with their children and parents.")
-                                ),
-                                default='SCENE')
-
-    apply_modifiers: BoolProperty(
-        name="Apply Modifiers",
-        description="Whether to apply Modifiers during export or not.",
-        default=True
-    )
-
-
-    animation_export: EnumProperty(name="Export Animation(s)",
-                                description="If/how animation data should be exported.",
-                                items=(
-                                    ('NONE', "None", "Do not include animation data in the export."),
-                                    ('ACTIVE', "Active", "Export animation extracted from the scene's Armature's active Action."),
-                                    ('BATCH', "Batch", "Export a separate animation file for each Action in the scene.")
-                                ),
-                                default='NONE')
-
-
-    def execute(self, context):
-
-        if 'SELECTED' in self.export_target and len(bpy.context.selected_objects) == 0:
-            raise Exception("{} was chosen, but you have not selected any objects. "
-                            " Don't forget to unhide all the objects you wish to select!".format(self.export_target))
-
-
-        scene, armature_obj = create_scene(
-                                generate_triangle_strips=self.generate_triangle_strips,
-                                apply_modifiers=self.apply_modifiers,
-                                export_target=self.export_target,
-                                skel_only=self.animation_export != 'NONE') # Exclude geometry data (except root stuff) if we're doing anims
-
-        if self.animation_export != 'NONE' and not armature_obj:
-            raise Exception("Could not find an armature object from which to export animations!")
-
-
-        def write_scene_to_file(filepath : str, scene_to_write : Scene):
-            with open(filepath, 'wb') as output_file:
-                save_scene(output_file=output_file, scene=scene_to_write)
-
-        if self.animation_export == 'ACTIVE':
-            set_scene_animation(scene, armature_obj)
-            write_scene_to_file(self.filepath, scene)
-
-        elif self.animation_export == 'BATCH':
-            export_dir = self.filepath if os.path.isdir(self.filepath) else os.path.dirname(self.filepath)
-
-            for action in bpy.data.actions:
-                anim_save_path = os.path.join(export_dir, action.name + ".msh")
-                armature_obj.animation_data.action = action
-                set_scene_animation(scene, armature_obj)
-                write_scene_to_file(anim_save_path, scene)
-        else:
-            write_scene_to_file(self.filepath, scene)
-
-        return {'FINISHED'}
-
-
-# Only needed if you want to add into a dynamic menu
-def menu_func_export(self, context):
-    self.layout.operator(ExportMSH.bl_idname, text="SWBF msh (.msh)")
-
-
-
-class ImportMSH(Operator, ImportHelper):
-    """ Import SWBF .msh file(s). """
-
-    bl_idname = "swbf_msh.import"
-    bl_label = "Import SWBF .msh File(s)"
-    filename_ext = ".msh"
-
-    files: CollectionProperty(
-            name="File Path(s)",
-            type=bpy.types.OperatorFileListElement,
-            )
-
-    filter_glob: StringProperty(
-        default="*.msh;*.zaa;*.zaabin",
-        options={'HIDDEN'},
-        maxlen=255,  # Max internal buffer length, longer would be clamped.
-    )
-
-    animation_only: BoolProperty(
-        name="Import Animation(s)",
-        description="Import one or more animations from the selected files and append each as a new Action to currently selected Armature.",
-        default=False
-    )
-
-
-    def execute(self, context):
-        dirname = os.path.dirname(self.filepath)
-        for file in self.files:
-            filepath = os.path.join(dirname, file.name)
-            if filepath.endswith(".zaabin") or filepath.endswith(".zaa"):
-                extract_and_apply_munged_anim(filepath)
-            else:
-                with open(filepath, 'rb') as input_file:
-                    scene = read_scene(input_file, self.animation_only)
-
-                if not self.animation_only:
-                    extract_scene(filepath, scene)
-                else:
-                    extract_and_apply_anim(filepath, scene)
-
-        return {'FINISHED'}
-
-def menu_func_import(self, context):
-    self.layout.operator(ImportMSH.bl_idname, text="SWBF msh (.msh)")
-
+try:
+    import bpy
+except ImportError:
+    # Imported outside of Blender, e.g. by process pool workers or by tools using
+    # the core modules (msh_scene_read, msh_scene_save, ...) which don't need bpy.
+    bpy = None
+
+if bpy is not None:
+    from .msh_io_operators import *
+    from .msh_material_properties import *
+    from .msh_skeleton_properties import *
+    from .msh_collision_prim_properties import *
+    from .msh_material_operators import *
 
 
 
@@ -0,0 +1,154 @@
+"""
+One-pass index of every chunk in a chunked (msh) file, for random access to chunks
+by their path instead of walking the whole file.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Iterator
+
+from .chunked_file_reader import Reader
+
+
+# Chunks made up of child chunks, mapped to the number of bytes
+# that come before their first child.
+CONTAINER_CHUNKS: Dict[str, int] = {
+    "HEDR": 0,
+    "MSH2": 0,
+    "SINF": 0,
+    "MATL": 4, # Material count
+    "MATD": 0,
+    "MODL": 0,
+    "GEOM": 0,
+    "SEGM": 0,
+    "CLTH": 0,
+    "ANM2": 0,
+}
+
+
+@dataclass
+class ChunkEntry:
+    """ Location of a chunk in a file. """
+
+    header: str
+    path: str
+    offset: int # Position of the chunk's header
+    size: int # Size of the chunk's data, as declared in the file
+    depth: int
+
+    parent: Optional["ChunkEntry"] = field(default=None, repr=False, compare=False)
+    children: List["ChunkEntry"] = field(default_factory=list, repr=False, compare=False)
+
+    @property
+    def data_offset(self) -> int:
+        return self.offset + 8
+
+    @property
+    def end_offset(self) -> int:
+        return self.offset + 8 + self.size
+
+    def get_children(self, header: str) -> List["ChunkEntry"]:
+        """ Returns the children of this chunk with the supplied header, in file order. """
+
+        return [child for child in self.children if child.header == header]
+
+
+class ChunkIndex:
+    """ Table of contents for a chunked file.
+
+        Paths are built from headers and the index of the chunk among its siblings with
+        the same header, e.g. "HEDR/MSH2/MODL[3]/GEOM/SEGM[1]/POSL".  An omitted index
+        means [0]. """
+
+    def __init__(self):
+        self.entries: List[ChunkEntry] = []
+        self.roots: List[ChunkEntry] = []
+        self._paths: Dict[str, ChunkEntry] = {}
+
+    def __iter__(self) -> Iterator[ChunkEntry]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return self.find(path) is not None
+
+    def add(self, entry: ChunkEntry):
+        self.entries.append(entry)
+        self._paths[entry.path] = entry
+
+        if entry.parent is None:
+            self.roots.append(entry)
+        else:
+            entry.parent.children.append(entry)
+
+    def find(self, path: str) -> Optional[ChunkEntry]:
+        """ Returns the chunk at path or None if there is no such chunk. """
+
+        return self._paths.get(normalize_chunk_path(path))
+
+    def find_all(self, header: str) -> List[ChunkEntry]:
+        """ Returns every chunk with the supplied header, in file order. """
+
+        return [entry for entry in self.entries if entry.header == header]
+
+    def open(self, reader: Reader, entry: ChunkEntry) -> Reader:
+        """ Positions reader at the chunk and returns a child Reader for it, to be used
+            like Reader.read_child(). reader can be any Reader over the indexed file. """
+
+        reader.set_current_pos(entry.offset)
+
+        return reader.read_child()
+
+
+def normalize_chunk_path(path: str) -> str:
+    """ Converts a chunk path to the form used as keys by ChunkIndex, in which every
+        header has an explicit sibling index. """
+
+    return "/".join(part if part.endswith("]") else part + "[0]" for part in path.split("/"))
+
+
+def index_chunks(reader: Reader) -> ChunkIndex:
+    """ Scans every chunk from the reader's current position to its end once and returns
+        the resulting ChunkIndex. Leaves the reader's position at its end. """
+
+    index = ChunkIndex()
+
+    _index_children(index, reader, None)
+
+    return index
+
+
+def _index_children(index: ChunkIndex, reader: Reader, parent: Optional[ChunkEntry]):
+    sibling_counts: Dict[str, int] = {}
+
+    while reader.could_have_child():
+
+        if not reader.next_chunk_fits():
+            # Padding or garbage between chunks
+            reader.resync()
+            continue
+
+        with reader.read_child() as child:
+            header = child.header
+
+            sibling_index = sibling_counts.get(header, 0)
+            sibling_counts[header] = sibling_index + 1
+
+            path = f"{header}[{sibling_index}]"
+
+            if parent is not None:
+                path = f"{parent.path}/{path}"
+
+            entry = ChunkEntry(header=header,
+                               path=path,
+                               offset=child.size_pos,
+                               size=child.size,
+                               depth=0 if parent is None else parent.depth + 1,
+                               parent=parent)
+
+            index.add(entry)
+
+            if header in CONTAINER_CHUNKS:
+                child.skip_bytes(CONTAINER_CHUNKS[header])
+                _index_children(index, child, entry)
@@ -3,15 +3,55 @@ Reader class for both zaabin, zaa, and msh files.
 """
 
 import io
+import mmap
+import re
 import struct
-import os
+import sys
 
-from mathutils import Vector, Quaternion
+from array import array
+
+from .msh_math import Vector, Quaternion
+
+
+# Chunk headers are always four upper case letters, digits or underscores.
+CHUNK_HEADER_PATTERN = re.compile(rb"[A-Z0-9_]{4}")
+
+
+class MappedFile:
+    """ Read-only view of a whole file, shared by a root Reader and all of its children.
+
+        The file is memory mapped when possible and read into memory once otherwise,
+        so every read is offset arithmetic into a single buffer instead of a file read. """
+
+    def __init__(self, file):
+        self.pos: int = file.tell()
+
+        try:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, io.UnsupportedOperation, OSError, ValueError):
+            # Empty files can't be mapped and in-memory files have no fileno.
+            file.seek(0)
+            self.data = file.read()
+
+        self.view = memoryview(self.data)
+
+    def close(self):
+        self.view.release()
+
+        if isinstance(self.data, mmap.mmap):
+            try:
+                self.data.close()
+            except BufferError:
+                # Slices of the buffer are still alive, the mapping
+                # is released once the last of them is dropped.
+                pass
 
 
 class Reader:
-    def __init__(self, file, parent=None, indent=0, debug=False):
+    def __init__(self, file, parent=None, indent=0, debug=False, keep_mapped=False):
         self.file = file
+        self.mapped = parent.mapped if parent is not None else None
+        self.keep_mapped = keep_mapped # Leave the file mapped after exiting without errors, for readers used after the root is done
         self.size: int = 0
         self.size_pos = None
         self.parent = parent
@@ -20,7 +60,10 @@ class Reader:
 
 
     def __enter__(self):
-        self.size_pos = self.file.tell()
+        if self.parent is None:
+            self.mapped = MappedFile(self.file)
+
+        self.size_pos = self.mapped.pos
 
         if self.parent is not None:
             self.header = self.read_bytes(4).decode("utf-8")
@@ -30,8 +73,8 @@ class Reader:
         if self.parent is not None:
             self.size = self.read_u32()
         else:
-            self.size = os.path.getsize(self.file.name) - 8
-        
+            self.size = len(self.mapped.data) - 8
+
         # No padding to multiples of 4.  Files exported from XSI via zetools do not align by 4!
         self.end_pos = self.size_pos + self.size + 8
 
@@ -48,59 +91,99 @@ class Reader:
         if self.debug:
             print("{}End {} at pos: {}".format(self.indent, self.header, self.end_pos))
 
-        self.file.seek(self.end_pos)
+        self.mapped.pos = self.end_pos
+
+        if self.parent is None and (not self.keep_mapped or exc_type is not None):
+            self.mapped.close()
+
+
+    def _unpack(self, fmt, num_bytes):
+        result = struct.unpack_from(fmt, self.mapped.data, self.mapped.pos)
+        self.mapped.pos += num_bytes
 
+        return result
 
 
     def read_bytes(self,num_bytes):
-        return self.file.read(num_bytes)
+        return bytes(self.read_view(num_bytes))
+
+    def read_view(self, num_bytes):
+        """ Returns the next num_bytes as a zero-copy slice of the file's buffer. """
+
+        pos = self.mapped.pos
+        self.mapped.pos += num_bytes
+
+        return self.mapped.view[pos : pos + num_bytes]
 
 
     def read_string(self):
-        last_byte = self.read_bytes(1)
-        result = b''
-        while last_byte[0] != 0x0:
-            result += last_byte
-            last_byte = self.read_bytes(1)
+        pos = self.mapped.pos
+        end = self.mapped.data.find(b"\0", pos)
 
-        return result.decode("utf-8")
+        if end == -1:
+            end = len(self.mapped.data)
+
+        self.mapped.pos = end + 1
+
+        return bytes(self.mapped.view[pos : end]).decode("utf-8")
 
     def read_i8(self, num=1):
-        buf = self.read_bytes(num)
-        result = struct.unpack(f"<{num}b", buf)
+        result = self._unpack(f"<{num}b", num)
         return result[0] if num == 1 else result
 
     def read_u8(self, num=1):
-        buf = self.read_bytes(num)
-        result = struct.unpack(f"<{num}B", buf)
+        result = self._unpack(f"<{num}B", num)
         return result[0] if num == 1 else result
 
     def read_i16(self, num=1):
-        buf = self.read_bytes(num * 2)
-        result = struct.unpack(f"<{num}h", buf)
+        result = self._unpack(f"<{num}h", num * 2)
         return result[0] if num == 1 else result
 
     def read_u16(self, num=1):
-        buf = self.read_bytes(num * 2)
-        result = struct.unpack(f"<{num}H", buf)
+        result = self._unpack(f"<{num}H", num * 2)
         return result[0] if num == 1 else result
 
     def read_i32(self, num=1):
-        buf = self.read_bytes(num * 4)
-        result = struct.unpack(f"<{num}i", buf)
+        result = self._unpack(f"<{num}i", num * 4)
         return result[0] if num == 1 else result
 
     def read_u32(self, num=1):
-        buf = self.read_bytes(num * 4) 
-        result = struct.unpack(f"<{num}I", buf)
+        result = self._unpack(f"<{num}I", num * 4)
         return result[0] if num == 1 else result
 
     def read_f32(self, num=1):
-        buf = self.read_bytes(num * 4)
-        result = struct.unpack(f"<{num}f", buf)
+        result = self._unpack(f"<{num}f", num * 4)
         return result[0] if num == 1 else result
 
 
+    def read_array(self, typecode, num):
+        """ Reads num values into an array.array of the supplied typecode
+            with a single copy out of the file's buffer. """
+
+        result = array(typecode)
+        num_bytes = num * result.itemsize
+        buf = self.read_view(num_bytes)
+
+        if len(buf) != num_bytes:
+            raise struct.error(f"unpack requires a buffer of {num_bytes} bytes")
+
+        result.frombytes(buf)
+
+        if sys.byteorder != "little":
+            result.byteswap()
+
+        return result
+
+    def read_u16_array(self, num):
+        return self.read_array("H", num)
+
+    def read_u32_array(self, num):
+        return self.read_array("I", num)
+
+    def read_f32_array(self, num):
+        return self.read_array("f", num)
+
+
     def read_quat(self):
         rot = self.read_f32(4)
         return Quaternion((rot[3], rot[0], rot[1], rot[2]))
@@ -115,13 +198,13 @@ class Reader:
 
 
     def skip_bytes(self,num):
-        self.file.seek(num,1)
+        self.mapped.pos += num
 
 
     def peak_next_header(self):
 
-        buf = self.read_bytes(4);
-        self.file.seek(-4,1)
+        pos = self.mapped.pos
+        buf = self.mapped.data[pos : pos + 4]
 
         try:
             result = buf.decode("utf-8")
@@ -129,25 +212,85 @@ class Reader:
         except:
             return ""
 
+    def peak_next_size(self):
+        return struct.unpack_from("<I", self.mapped.data, self.mapped.pos + 4)[0]
+
+    def next_chunk_fits(self):
+        """ Checks if a plausible chunk header follows and if the chunk it starts fits
+            inside of this one. """
+
+        if not self.could_have_child():
+            return False
+
+        pos = self.mapped.pos
+
+        if CHUNK_HEADER_PATTERN.fullmatch(self.mapped.data, pos, pos + 4) is None:
+            return False
+
+        return pos + 8 + self.peak_next_size() <= self.end_pos
+
     def get_current_pos(self):
-        return self.file.tell()
+        return self.mapped.pos
+
+    def set_current_pos(self, pos):
+        self.mapped.pos = pos
 
     def reset_pos(self):
-        self.file.seek(self.size_pos - self.file.tell() + 8, 1)
+        self.mapped.pos = self.size_pos + 8
 
     def how_much_left(self, pos):
         return self.end_pos - pos
 
     def bytes_remaining(self):
-        return self.end_pos - self.file.tell()
+        return self.end_pos - self.mapped.pos
 
     def skip_until(self, header):
-        while (self.could_have_child() and header not in self.peak_next_header()):
-            self.skip_bytes(1)
+        pos = self.mapped.pos
+        last_header_pos = self.end_pos - 8
+
+        if pos > last_header_pos:
+            return
+
+        found_pos = self.mapped.data.find(header.encode("utf-8"), pos, last_header_pos + 4)
+
+        self.mapped.pos = found_pos if found_pos != -1 else last_header_pos + 1
+
+    def skip_chunk(self):
+        """ Skips the next chunk using its declared size. If no valid chunk follows
+            (padding, garbage or a misaligned file) resyncs to the next plausible header instead. """
+
+        if self.next_chunk_fits():
+            self.mapped.pos += 8 + self.peak_next_size()
+        else:
+            self.resync()
+
+    def resync(self):
+        """ Moves to the next position, at least one byte ahead, that starts a plausible
+            chunk header followed by a size that fits inside of this chunk, or to the end
+            of this chunk if there is none. """
+
+        data = self.mapped.data
+        search_pos = self.mapped.pos + 1
+
+        while True:
+            match = CHUNK_HEADER_PATTERN.search(data, search_pos, self.end_pos)
+
+            # A header without room for its size after it, every later one is short too.
+            if match is None or match.start() + 8 > self.end_pos:
+                self.mapped.pos = self.end_pos
+                return
+
+            pos = match.start()
+
+            if pos + 8 + struct.unpack_from("<I", data, pos + 4)[0] <= self.end_pos:
+                self.mapped.pos = pos
+                return
+
+            search_pos = pos + 1
 
 
     def could_have_child(self):
-    	return self.end_pos - self.file.tell() >= 8
+    	return self.end_pos - self.mapped.pos >= 8
 
 
     MAX_SIZE: int = 2147483647 - 8
@@ -0,0 +1,173 @@
+""" In-memory cache of processed and serialized model geometry, kept for the Blender
+    session so re-exports only process the objects that changed since the last export. """
+
+import hashlib
+
+from array import array
+from collections import Counter, OrderedDict
+from copy import copy
+from typing import Dict, List, Optional, Tuple
+
+from .msh_model import GeometrySegment
+
+# Least recently used entries are dropped once the cache takes up more than about this many bytes.
+EXPORT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+# Rough memory use of the Python objects geometry is made of, for estimating the size of entries.
+_VERTEX_ATTRIBUTE_BYTES: int = 104
+_VERTEX_WEIGHT_BYTES: int = 80
+_INDEX_BYTES: int = 12
+
+
+class ExportCache:
+    """ Caches the geometry of models after create_scene has processed it (triangle strips
+        generated, vertices reordered, ...) and the 'SEGM' chunks it was serialized to.
+
+        Entries are keyed by a hash of the evaluated mesh the geometry was created from and
+        of the export options used to process it, see create_key. Which key belongs to
+        which model of the scene being exported is tracked in model_keys.
+
+        A model's previous entry is dropped when geometry is stored for it under a new key, and
+        the least recently used entries when the cache grows beyond about max_bytes. """
+
+    def __init__(self, max_bytes: int = EXPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+
+        # Model name -> key, for the models of the current export.
+        self.model_keys: Dict[str, str] = {}
+
+        # Models in model_keys whose geometry came from the cache and is already processed.
+        self.processed_models = set()
+
+        self.options_key: str = ""
+
+        self._geometry: OrderedDict = OrderedDict()
+        self._segm_chunks: Dict[str, Tuple[Tuple[int, ...], List[bytes]]] = {}
+
+        # Model name -> key its geometry was last stored under, kept across exports.
+        self._stored_keys: Dict[str, str] = {}
+        self._key_model_counts: Counter = Counter()
+
+        # Key -> estimated bytes of its geometry and 'SEGM' chunks.
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes: int = 0
+
+    def begin_export(self, options_key: str):
+        """ Starts a new export, with options_key identifying every export option
+            that changes how geometry is processed. """
+
+        self.model_keys = {}
+        self.processed_models = set()
+        self.options_key = options_key
+
+    def create_key(self, *values) -> str:
+        """ Creates a key from the current export's options_key and values,
+            each of which is bytes, a buffer like array.array, or has a str(). """
+
+        digest = hashlib.sha1(self.options_key.encode("utf-8"))
+
+        for value in values:
+            if isinstance(value, (bytes, bytearray, array)):
+                data = bytes(value)
+            else:
+                data = str(value).encode("utf-8")
+
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+
+        return digest.hexdigest()
+
+    def get_geometry(self, key: str) -> Optional[List[GeometrySegment]]:
+        """ Returns copies of the processed geometry stored for key or None if there is none. """
+
+        geometry = self._geometry.get(key)
+
+        if geometry is None:
+            return None
+
+        self._geometry.move_to_end(key)
+
+        return [copy(segment) for segment in geometry]
+
+    def store_geometry(self, model_name: str, key: str, geometry: List[GeometrySegment]):
+        """ Stores processed geometry for key, made for the model named model_name. The
+            entry previously stored for the model is removed, unless another model uses it. """
+
+        previous_key = self._stored_keys.get(model_name)
+
+        if previous_key != key:
+            self._stored_keys[model_name] = key
+            self._key_model_counts[key] += 1
+
+            if previous_key is not None:
+                self._key_model_counts[previous_key] -= 1
+
+                if self._key_model_counts[previous_key] <= 0:
+                    del self._key_model_counts[previous_key]
+                    self._remove(previous_key)
+
+        self._remove(key)
+
+        self._geometry[key] = [copy(segment) for segment in geometry]
+        self._add_size(key, sum(_get_segment_size(segment) for segment in geometry))
+
+        while self._total_bytes > self.max_bytes and len(self._geometry) > 1:
+            self._remove(next(iter(self._geometry)))
+
+    def get_segm_chunks(self, key: str, material_indices: Tuple[int, ...]) -> Optional[List[bytes]]:
+        """ Returns the 'SEGM' chunks stored for key, if they were serialized with the same material indices. """
+
+        chunks = self._segm_chunks.get(key)
+
+        if chunks is None or chunks[0] != material_indices:
+            return None
+
+        return chunks[1]
+
+    def store_segm_chunks(self, key: str, material_indices: Tuple[int, ...], chunks: List[bytes]):
+        """ Stores the 'SEGM' chunks for the geometry stored for key. """
+
+        if key not in self._geometry:
+            return
+
+        previous_chunks = self._segm_chunks.get(key)
+
+        if previous_chunks is not None:
+            self._add_size(key, -sum(len(chunk) for chunk in previous_chunks[1]))
+
+        self._segm_chunks[key] = (material_indices, chunks)
+        self._add_size(key, sum(len(chunk) for chunk in chunks))
+
+    def clear(self):
+        self._geometry.clear()
+        self._segm_chunks.clear()
+        self._stored_keys.clear()
+        self._key_model_counts.clear()
+        self._sizes.clear()
+        self._total_bytes = 0
+
+    def _add_size(self, key: str, size: int):
+        self._sizes[key] = self._sizes.get(key, 0) + size
+        self._total_bytes += size
+
+    def _remove(self, key: str):
+        self._geometry.pop(key, None)
+        self._segm_chunks.pop(key, None)
+        self._total_bytes -= self._sizes.pop(key, 0)
+
+
+def _get_segment_size(segment: GeometrySegment) -> int:
+    """ Estimates the memory used by segment's vertices and indices. """
+
+    vertex_count = len(segment.positions)
+    vertex_attributes = 1 + bool(segment.normals) + bool(segment.texcoords) + (segment.colors is not None)
+
+    size = vertex_count * vertex_attributes * _VERTEX_ATTRIBUTE_BYTES
+
+    if segment.weights is not None:
+        size += sum(len(weights) for weights in segment.weights) * _VERTEX_WEIGHT_BYTES
+
+    for indices in (segment.polygons, segment.triangles, segment.triangle_strips or []):
+        size += sum(len(index_list) + 1 for index_list in indices) * _INDEX_BYTES
+
+    return size
@@ -0,0 +1,279 @@
+""" Blender operators for importing and exporting .msh files. """
+
+import os
+import bpy
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+from bpy.props import BoolProperty, EnumProperty, CollectionProperty, StringProperty, IntProperty, FloatProperty
+from bpy.types import Operator
+from .msh_scene import Scene
+from .msh_scene_utilities import create_scene, set_scene_animation
+from .msh_model_gather import VertexWeldTolerances
+from .msh_model_triangle_strips import DEFAULT_VERTEX_CACHE_SIZE
+from .msh_strip_statistics import format_strip_statistics
+from .msh_strip_cache import TriangleStripCache, get_default_strip_cache_dir
+from .msh_export_cache import ExportCache
+from .msh_scene_save import save_scene
+from .msh_scene_read import read_scene_files
+from .msh_scene_to_blend import extract_scene
+from .msh_anim_to_blend import extract_and_apply_anim
+from .zaa_to_blend import extract_and_apply_munged_anim
+
+# Processed geometry of exported models, kept for the rest of the Blender session.
+EXPORT_CACHE = ExportCache()
+
+class ExportMSH(Operator, ExportHelper):
+    """ Export the current scene as a SWBF .msh file. """
+
+    bl_idname = "swbf_msh.export"
+    bl_label = "Export SWBF .msh File"
+    filename_ext = ".msh"
+
+    filter_glob: StringProperty(
+        default="*.msh",
+        options={'HIDDEN'},
+        maxlen=255,  # Max internal buffer length, longer would be clamped.
+    )
+
+    generate_triangle_strips: BoolProperty(
+        name="Generate Triangle Strips",
+        description="Generate triangle strips for the exported geometry.\n\n"
+                    "In order to improve runtime performance and reduce munged model size you are "
+                    "**strongly** advised to leave it on!",
+        default=True
+    )
+
+    triangle_strip_quality: EnumProperty(name="Triangle Strip Quality",
+                                         description="How to generate triangle strips.",
+                                         items=(
+                                             ('FAST', "Fast", "Generate long triangle strips quickly."),
+                                             ('VERTEX_CACHE', "Vertex Cache Optimized", "Generate triangle strips that make better use of the GPU's "
+                                                                                       "post-transform vertex cache.  Faster to render, but exporting takes "
+                                                                                       "roughly ten times as long as Fast.")
+                                         ),
+                                         default='FAST')
+
+    vertex_cache_size: IntProperty(
+        name="Vertex Cache Size",
+        description="Number of vertices in the post-transform vertex cache to optimize triangle strips for.",
+        default=DEFAULT_VERTEX_CACHE_SIZE,
+        min=4,
+        max=64
+    )
+
+    cache_triangle_strips: BoolProperty(
+        name="Cache Triangle Strips",
+        description="Save generated triangle strips to a cache on disk and reuse them for segments "
+                    "that haven't changed since they were last exported.",
+        default=True
+    )
+
+    cache_exported_models: BoolProperty(
+        name="Cache Exported Models",
+        description="Keep the processed geometry of exported models in memory for the rest of the session "
+                    "and reuse it for models that haven't changed when exporting again.",
+        default=True
+    )
+
+    triangle_strip_report: BoolProperty(
+        name="Triangle Strip Report",
+        description="Print statistics on how well each segment's triangle strips turned out and save them "
+                    "next to the exported file as '<name>.strips.txt'.",
+        default=False
+    )
+
+    reduce_overdraw: BoolProperty(
+        name="Reduce Overdraw",
+        description="Reorder the triangles of static models so the parts most likely to hide the rest of the "
+                    "model are drawn first, while keeping good use of the vertex cache.",
+        default=False
+    )
+
+    weld_vertices: BoolProperty(
+        name="Weld Vertices",
+        description="Merge vertices whose positions, normals, UVs, colors and weights snap to the same "
+                    "values on grids spaced by the weld tolerances, instead of only vertices that match exactly. "
+                    "Values close together but either side of a grid line aren't merged.",
+        default=False
+    )
+
+    weld_position_tolerance: FloatProperty(
+        name="Position Tolerance",
+        description="Grid spacing vertex positions are snapped to before welding.",
+        default=1e-5,
+        min=0.0,
+        precision=6,
+        unit='LENGTH'
+    )
+
+    weld_normal_tolerance: FloatProperty(
+        name="Normal Tolerance",
+        description="Grid spacing the components of vertex normals are snapped to before welding.",
+        default=1e-4,
+        min=0.0,
+        precision=6
+    )
+
+    weld_uv_tolerance: FloatProperty(
+        name="UV Tolerance",
+        description="Grid spacing vertex UVs are snapped to before welding.",
+        default=1e-5,
+        min=0.0,
+        precision=6
+    )
+
+    weld_color_tolerance: FloatProperty(
+        name="Color Tolerance",
+        description="Grid spacing the channels of vertex colors are snapped to before welding.",
+        default=1.0 / 512.0,
+        min=0.0,
+        precision=6
+    )
+
+    weld_weight_tolerance: FloatProperty(
+        name="Weight Tolerance",
+        description="Grid spacing vertex weights are snapped to before welding.",
+        default=1e-4,
+        min=0.0,
+        precision=6
+    )
+
+    export_target: EnumProperty(name="Export Target",
+                                description="What to export.",
+                                items=(
+                                    ('SCENE', "Scene", "Export the current active scene."),
+                                    ('SELECTED', "Selected", "Export the currently selected objects and their parents."),
+                                    ('SELECTED_WITH_CHILDREN', "Selected with Children", "Export the currently selected objects with their children and parents.")
+                                ),
+                                default='SCENE')
+
+    apply_modifiers: BoolProperty(
+        name="Apply Modifiers",
+        description="Whether to apply Modifiers during export or not.",
+        default=True
+    )
+
+
+    animation_export: EnumProperty(name="Export Animation(s)",
+                                description="If/how animation data should be exported.",
+                                items=(
+                                    ('NONE', "None", "Do not include animation data in the export."),
+                                    ('ACTIVE', "Active", "Export animation extracted from the scene's Armature's active Action."),
+                                    ('BATCH', "Batch", "Export a separate animation file for each Action in the scene.")
+                                ),
+                                default='NONE')
+
+
+    def execute(self, context):
+
+        if 'SELECTED' in self.export_target and len(bpy.context.selected_objects) == 0:
+            raise Exception("{} was chosen, but you have not selected any objects. "
+                            " Don't forget to unhide all the objects you wish to select!".format(self.export_target))
+
+
+        strip_statistics = [] if self.triangle_strip_report else None
+        export_cache = EXPORT_CACHE if self.cache_exported_models else None
+
+        scene, armature_obj = create_scene(
+                                generate_triangle_strips=self.generate_triangle_strips,
+                                optimize_triangle_strips=self.triangle_strip_quality == 'VERTEX_CACHE',
+                                vertex_cache_size=self.vertex_cache_size,
+                                strip_statistics=strip_statistics,
+                                strip_cache=TriangleStripCache(get_default_strip_cache_dir()) if self.cache_triangle_strips else None,
+                                reduce_overdraw=self.reduce_overdraw,
+                                export_cache=export_cache,
+                                weld_tolerances=VertexWeldTolerances(position=self.weld_position_tolerance,
+                                                                     normal=self.weld_normal_tolerance,
+                                                                     texcoord=self.weld_uv_tolerance,
+                                                                     color=self.weld_color_tolerance,
+                                                                     weight=self.weld_weight_tolerance) if self.weld_vertices else None,
+                                apply_modifiers=self.apply_modifiers,
+                                export_target=self.export_target,
+                                skel_only=self.animation_export != 'NONE') # Exclude geometry data (except root stuff) if we're doing anims
+
+        if self.animation_export != 'NONE' and not armature_obj:
+            raise Exception("Could not find an armature object from which to export animations!")
+
+        if strip_statistics:
+            report = format_strip_statistics(strip_statistics)
+            print(report)
+
+            with open(os.path.splitext(self.filepath)[0] + ".strips.txt", 'w') as report_file:
+                report_file.write(report + "\n")
+
+
+        def write_scene_to_file(filepath : str, scene_to_write : Scene):
+            with open(filepath, 'wb') as output_file:
+                save_scene(output_file=output_file, scene=scene_to_write, export_cache=export_cache)
+
+        if self.animation_export == 'ACTIVE':
+            set_scene_animation(scene, armature_obj)
+            write_scene_to_file(self.filepath, scene)
+
+        elif self.animation_export == 'BATCH':
+            export_dir = self.filepath if os.path.isdir(self.filepath) else os.path.dirname(self.filepath)
+
+            for action in bpy.data.actions:
+                anim_save_path = os.path.join(export_dir, action.name + ".msh")
+                armature_obj.animation_data.action = action
+                set_scene_animation(scene, armature_obj)
+                write_scene_to_file(anim_save_path, scene)
+        else:
+            write_scene_to_file(self.filepath, scene)
+
+        return {'FINISHED'}
+
+
+# Only needed if you want to add into a dynamic menu
+def menu_func_export(self, context):
+    self.layout.operator(ExportMSH.bl_idname, text="SWBF msh (.msh)")
+
+
+
+class ImportMSH(Operator, ImportHelper):
+    """ Import SWBF .msh file(s). """
+
+    bl_idname = "swbf_msh.import"
+    bl_label = "Import SWBF .msh File(s)"
+    filename_ext = ".msh"
+
+    files: CollectionProperty(
+            name="File Path(s)",
+            type=bpy.types.OperatorFileListElement,
+            )
+
+    filter_glob: StringProperty(
+        default="*.msh;*.zaa;*.zaabin",
+        options={'HIDDEN'},
+        maxlen=255,  # Max internal buffer length, longer would be clamped.
+    )
+
+    animation_only: BoolProperty(
+        name="Import Animation(s)",
+        description="Import one or more animations from the selected files and append each as a new Action to currently selected Armature.",
+        default=False
+    )
+
+
+    def execute(self, context):
+        dirname = os.path.dirname(self.filepath)
+        msh_filepaths = []
+
+        for file in self.files:
+            filepath = os.path.join(dirname, file.name)
+            if filepath.endswith(".zaabin") or filepath.endswith(".zaa"):
+                extract_and_apply_munged_anim(filepath)
+            else:
+                msh_filepaths.append(filepath)
+
+        # .msh files are parsed in worker processes while the
+        # Blender objects for already parsed ones are created here.
+        for filepath, scene in read_scene_files(msh_filepaths, self.animation_only):
+            if not self.animation_only:
+                extract_scene(filepath, scene)
+            else:
+                extract_and_apply_anim(filepath, scene)
+
+        return {'FINISHED'}
+
+def menu_func_import(self, context):
+    self.layout.operator(ImportMSH.bl_idname, text="SWBF msh (.msh)")
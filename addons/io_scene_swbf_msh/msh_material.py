@@ -1,10 +1,10 @@
 """ Contains Material and dependent types for representing materials easilly
     saved to a .msh file. """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Tuple
 from enum import Enum, Flag
-from mathutils import Color
+from .msh_math import Color
 
 class Rendertype(Enum):
     # TODO: Add SWBF1 rendertypes.
@@ -61,7 +61,7 @@ class Material:
 
     name: str = ""
 
-    specular_color: Color = Color((1.0, 1.0, 1.0))
+    specular_color: Color = field(default_factory=lambda: Color((1.0, 1.0, 1.0)))
     rendertype: Rendertype = Rendertype.NORMAL
     flags: MaterialFlags = MaterialFlags.NONE
     data: Tuple[int, int] = (0, 0)
@@ -0,0 +1,155 @@
+""" Vector types used by the core (non-Blender) parts of the addon.
+
+    Inside Blender these are the mathutils types.  Elsewhere, such as in process pool
+    workers or command line tools reading and writing .msh files, mathutils doesn't
+    exist and small pure Python stand-ins with the parts of the mathutils interface
+    used by the core modules are used instead. """
+
+import math
+
+from typing import Iterable
+
+try:
+    from mathutils import Vector, Quaternion, Color
+except ImportError:
+
+    class _Components:
+        """ Fixed size sequence of floats with named component access. """
+
+        __slots__ = ("_values",)
+
+        _names = ""
+
+        def __init__(self, values: Iterable[float]):
+            self._values = [float(v) for v in values]
+
+        def __len__(self):
+            return len(self._values)
+
+        def __iter__(self):
+            return iter(self._values)
+
+        def __getitem__(self, index):
+            return self._values[index]
+
+        def __setitem__(self, index, value):
+            self._values[index] = float(value)
+
+        def __eq__(self, other):
+            try:
+                return len(self) == len(other) and all(l == r for l, r in zip(self, other))
+            except TypeError:
+                return NotImplemented
+
+        # Mutable, like unfrozen mathutils types
+        __hash__ = None
+
+        def __repr__(self):
+            return "{}(({}))".format(type(self).__name__, ", ".join(repr(v) for v in self._values))
+
+        def __reduce__(self):
+            # Pickled by value so that unpickling inside Blender creates mathutils types.
+            return (type(self), (tuple(self._values),))
+
+        def __getattr__(self, name):
+            index = type(self)._names.find(name)
+
+            if len(name) != 1 or index == -1 or index >= len(self._values):
+                raise AttributeError(f"{type(self).__name__} has no attribute '{name}'")
+
+            return self._values[index]
+
+        def __setattr__(self, name, value):
+            index = type(self)._names.find(name)
+
+            if len(name) != 1 or index == -1 or index >= len(self._values):
+                object.__setattr__(self, name, value)
+            else:
+                self._values[index] = float(value)
+
+        def copy(self):
+            return type(self)(self._values)
+
+        def to_tuple(self):
+            return tuple(self._values)
+
+
+    class Vector(_Components):
+        """ Stand-in for mathutils.Vector. """
+
+        __slots__ = ()
+
+        _names = "xyzw"
+
+        def __init__(self, values: Iterable[float] = (0.0, 0.0, 0.0)):
+            super().__init__(values)
+
+        @property
+        def length(self) -> float:
+            return math.sqrt(sum(v * v for v in self._values))
+
+        def dot(self, other) -> float:
+            return sum(l * r for l, r in zip(self, other))
+
+        def cross(self, other) -> "Vector":
+            return Vector((self[1] * other[2] - self[2] * other[1],
+                           self[2] * other[0] - self[0] * other[2],
+                           self[0] * other[1] - self[1] * other[0]))
+
+        def __add__(self, other):
+            return Vector(l + r for l, r in zip(self, other))
+
+        def __sub__(self, other):
+            return Vector(l - r for l, r in zip(self, other))
+
+        def __mul__(self, scalar):
+            return Vector(v * scalar for v in self._values)
+
+        __rmul__ = __mul__
+
+        def __neg__(self):
+            return Vector(-v for v in self._values)
+
+
+    class Quaternion(_Components):
+        """ Stand-in for mathutils.Quaternion. Components are ordered w, x, y, z. """
+
+        __slots__ = ()
+
+        _names = "wxyz"
+
+        def __init__(self, values: Iterable[float] = (1.0, 0.0, 0.0, 0.0)):
+            super().__init__(values)
+
+        def __matmul__(self, other):
+            if isinstance(other, Quaternion):
+                w0, x0, y0, z0 = self._values
+                w1, x1, y1, z1 = other._values
+
+                return Quaternion((w0 * w1 - x0 * x1 - y0 * y1 - z0 * z1,
+                                   w0 * x1 + x0 * w1 + y0 * z1 - z0 * y1,
+                                   w0 * y1 - x0 * z1 + y0 * w1 + z0 * x1,
+                                   w0 * z1 + x0 * y1 - y0 * x1 + z0 * w1))
+
+            # Rotate a vector, v + 2w(q x v) + 2q x (q x v)
+            w, x, y, z = self._values
+            vx, vy, vz = other
+
+            tx = 2.0 * (y * vz - z * vy)
+            ty = 2.0 * (z * vx - x * vz)
+            tz = 2.0 * (x * vy - y * vx)
+
+            return Vector((vx + w * tx + y * tz - z * ty,
+                           vy + w * ty + z * tx - x * tz,
+                           vz + w * tz + x * ty - y * tx))
+
+
+    class Color(_Components):
+        """ Stand-in for mathutils.Color. """
+
+        __slots__ = ()
+
+        _names = "rgb"
+
+        def __init__(self, values: Iterable[float] = (0.0, 0.0, 0.0)):
+            super().__init__(values)
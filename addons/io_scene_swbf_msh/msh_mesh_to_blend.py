@@ -68,7 +68,8 @@ def model_to_mesh_object(model: Model, scene : Scene, materials_map : Dict[str,
 
             blender_mesh.materials.append(materials_map[segment.material_name])
 
-            vertex_positions += [tuple(convert_vector_space(p)) for p in segment.positions]
+            # Same as convert_vector_space, but without creating a Vector per vertex
+            vertex_positions += [(-p[0], p[2], p[1]) for p in segment.positions]
 
             if segment.texcoords:
                 vertex_uvs += [tuple(texcoord) for texcoord in segment.texcoords]
@@ -76,10 +77,10 @@ def model_to_mesh_object(model: Model, scene : Scene, materials_map : Dict[str,
                 vertex_uvs += [(0.0,0.0) for _ in range(len(segment.positions))]
 
             if segment.normals:
-                vertex_normals += [tuple(convert_vector_space(n)) for n in segment.normals]
+                vertex_normals += [(-n[0], n[2], n[1]) for n in segment.normals]
 
             if segment.colors:
-                vertex_colors.extend(segment.colors)
+                vertex_colors.extend(component for color in segment.colors for component in color)
             elif geometry_has_colors:
                 [vertex_colors.extend([0.0, 0.0, 0.0, 1.0]) for _ in range(len(segment.positions))]
             
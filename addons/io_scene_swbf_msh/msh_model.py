@@ -4,7 +4,7 @@
 from dataclasses import dataclass, field
 from typing import List, Tuple, Dict
 from enum import Enum
-from mathutils import Vector, Quaternion
+from .msh_math import Vector, Quaternion
 
 class ModelType(Enum):
     NULL = 0
@@ -56,6 +56,10 @@ class GeometrySegment:
     triangles: List[List[int]] = field(default_factory=list)
     triangle_strips: List[List[int]] = None
 
+    # Not saved. Where each cluster of triangles made by reorder_triangles_for_overdraw starts
+    # in triangles, triangle strips are made within each cluster so the clusters keep their order.
+    triangle_clusters: List[int] = None
+
 
 @dataclass
 class CollisionPrimitive:
@@ -82,6 +86,10 @@ class Model:
     geometry: List[GeometrySegment] = None
     collisionprimitive: CollisionPrimitive = None
 
+    # Not saved. Set by gather_models to the same key for models sharing the geometry of one mesh,
+    # so create_scene only processes it once.
+    shared_geometry_key: Tuple = None
+
 
 @dataclass
 class RotationFrame:
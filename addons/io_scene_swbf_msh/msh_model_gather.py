@@ -3,27 +3,163 @@
 
 import bpy
 import math
+from array import array
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Set, Dict, Tuple
+from typing import List, Set, Dict, Tuple, Iterator, Optional
 from itertools import zip_longest
 from .msh_model import *
 from .msh_model_utilities import *
 from .msh_utilities import *
 from .msh_skeleton_utilities import *
+from .msh_export_cache import ExportCache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 SKIPPED_OBJECT_TYPES = {"LATTICE", "CAMERA", "LIGHT", "SPEAKER", "LIGHT_PROBE"}
 MESH_OBJECT_TYPES = {"MESH", "CURVE", "SURFACE", "META", "FONT", "GPENCIL"}
 MAX_MSH_VERTEX_COUNT = 32767
 
-def gather_models(apply_modifiers: bool, export_target: str, skeleton_only: bool) -> Tuple[List[Model], bpy.types.Object]:
+@dataclass
+class VertexWeldTolerances:
+    """ Grid spacings for create_mesh_geometry to weld vertices with. Each attribute is snapped
+        to a grid with its tolerance as the spacing before vertices are compared, so values in
+        the same cell are welded but values closer than the tolerance on either side of a cell
+        boundary are not. A tolerance of 0.0 only welds exactly equal values. """
+
+    position: float = 0.0
+    normal: float = 0.0
+    texcoord: float = 0.0
+    color: float = 0.0
+    weight: float = 0.0
+
+# .msh files store at most this many bone weights for each vertex.
+MAX_VERTEX_WEIGHTS = 4
+
+def quantize(value: float, tolerance: float):
+    """ Snaps value to a grid with tolerance spacing, returning the grid cell. Returns value if tolerance is 0.0. """
+
+    if tolerance > 0.0:
+        return round(value / tolerance)
+
+    return value
+
+@dataclass
+class SceneGraph:
+    """ Index of the parent/child relationships between the objects of the current scene,
+        built once per export so they don't need to be found by walking the scene. """
+
+    # Children of each object with children, keyed by its name, in the scene's object order.
+    children: Dict[str, List[bpy.types.Object]] = field(default_factory=dict)
+
+    # Names of the objects with at least one child.
+    parents: Set[str] = field(default_factory=set)
+
+def create_scene_graph() -> SceneGraph:
+    """ Creates the SceneGraph for the current scene in a single pass over its objects. """
+
+    scene_graph = SceneGraph()
+
+    for obj in bpy.context.scene.objects:
+        if obj.parent is not None:
+            scene_graph.children.setdefault(obj.parent.name, []).append(obj)
+
+    scene_graph.parents = set(scene_graph.children.keys())
+
+    return scene_graph
+
+def gather_models(apply_modifiers: bool, export_target: str, skeleton_only: bool,
+                  weld_tolerances: VertexWeldTolerances = None,
+                  export_cache: ExportCache = None) -> Tuple[List[Model], bpy.types.Object]:
     """ Gathers the Blender objects from the current scene and returns them as a list of
-        Model objects. """
+        Model objects. If weld_tolerances is not None, near identical vertices are welded with them.
+        If export_cache is not None, geometry it has for unchanged meshes is taken from it.
+
+        Only what's needed is evaluated: nothing without apply_modifiers and only the selected
+        objects (and the objects they depend on) when exporting a selection. """
+
+    scene_graph = create_scene_graph()
+    export_objects = select_objects(export_target, scene_graph)
 
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    parents = create_parents_set()
+    if not apply_modifiers:
+        return gather_objects_models(export_objects, None, scene_graph, skeleton_only, weld_tolerances, export_cache)
+
+    if export_target not in {"SELECTED", "SELECTED_WITH_CHILDREN"}:
+        return gather_objects_models(export_objects, bpy.context.evaluated_depsgraph_get(), scene_graph,
+                                     skeleton_only, weld_tolerances, export_cache)
+
+    with evaluate_objects(export_objects) as depsgraph:
+        models, armature = gather_objects_models(export_objects, depsgraph, scene_graph, skeleton_only,
+                                                 weld_tolerances, export_cache)
+
+        # Objects evaluated by evaluate_objects are freed along with its depsgraph.
+        return models, armature.original if armature is not None else None
+
+@contextmanager
+def evaluate_objects(objects: List[bpy.types.Object]) -> Iterator[bpy.types.Depsgraph]:
+    """ Evaluates only objects (and anything they depend on, like the targets of their modifiers)
+        instead of the whole scene.
+
+        This is done in a temporary view layer of the current scene, in which collections not
+        holding any of objects are excluded and other objects in the remaining ones are hidden. It is
+        removed again once the with block is left. Adding and removing it are edits of the scene
+        like any other, they run depsgraph update handlers and can show in the undo history. """
+
+    scene = bpy.context.scene
+    collections = {collection for obj in objects for collection in obj.users_collection}
+    object_names = {obj.name_full for obj in objects}
+
+    def exclude_other_collections(layer_collection: bpy.types.LayerCollection) -> bool:
+        holds_objects = layer_collection.collection in collections
+
+        for child in layer_collection.children:
+            if exclude_other_collections(child):
+                holds_objects = True
+            else:
+                child.exclude = True
+
+        return holds_objects
+
+    view_layer = scene.view_layers.new(name="SWBF msh Export")
+
+    try:
+        exclude_other_collections(view_layer.layer_collection)
+
+        # The collections left can hold many more objects than are exported. Hidden objects
+        # are only evaluated if a visible one depends on them.
+        for obj in view_layer.objects:
+            if obj.name_full not in object_names:
+                obj.hide_set(True, view_layer=view_layer)
+
+        depsgraph = view_layer.depsgraph
+        depsgraph.update()
+
+        yield depsgraph
+    finally:
+        scene.view_layers.remove(view_layer)
+
+def gather_objects_models(objects: List[bpy.types.Object], depsgraph: bpy.types.Depsgraph, scene_graph: SceneGraph,
+                          skeleton_only: bool, weld_tolerances: VertexWeldTolerances,
+                          export_cache: ExportCache = None) -> Tuple[List[Model], bpy.types.Object]:
+    """ Gathers the models for gather_models from objects selected by select_objects.
+        Objects are evaluated in depsgraph first if it isn't None.
+
+        When export_cache is not None each mesh model's key is recorded in its model_keys, and
+        models whose geometry was taken from it are added to its processed_models. """
+
+    parents = scene_graph.parents
 
     models_list: List[Model] = []
 
+    # Geometry already created for objects sharing a mesh, keyed by get_shared_geometry_key,
+    # along with its export_cache key and whether it came from export_cache.
+    shared_geometry: Dict[Tuple, Tuple[List[GeometrySegment], Optional[str], bool]] = {}
+
     # Composite bones are bones which have geometry.  
     # If a child object has the same name, it will take said child's geometry.
 
@@ -50,19 +186,19 @@ def gather_models(apply_modifiers: bool, export_target: str, skeleton_only: bool
     # that will be exported.  This is necessary so we can prune vertex
     # groups that do not reference exported objects in the main 
     # model building loop below this one.
-    for uneval_obj in select_objects(export_target):
+    for uneval_obj in objects:
 
         if get_is_model_hidden(uneval_obj):
             blender_objects_to_hide.add(uneval_obj.name)
 
         if uneval_obj.type == "ARMATURE" and not armature_found:
             # Keep track of the armature, we don't want to process > 1!
-            armature_found = uneval_obj.evaluated_get(depsgraph) if apply_modifiers else uneval_obj
+            armature_found = uneval_obj.evaluated_get(depsgraph) if depsgraph is not None else uneval_obj
             # Get all bones in a separate list.  While we iterate through
             # objects we removed bones with geometry from this dict.  After iteration
             # is done, we add the remaining bones to the models from exported
             # scene objects.
-            pure_bones_from_armature = expand_armature(armature_found)
+            pure_bones_from_armature = expand_armature(armature_found, scene_graph)
             # All bones to set
             exported_object_names.update(pure_bones_from_armature.keys())
         
@@ -75,7 +211,7 @@ def gather_models(apply_modifiers: bool, export_target: str, skeleton_only: bool
 
     for uneval_obj in blender_objects_to_export:
 
-        obj = uneval_obj.evaluated_get(depsgraph) if apply_modifiers else uneval_obj
+        obj = uneval_obj.evaluated_get(depsgraph) if depsgraph is not None else uneval_obj
 
         check_for_bad_lod_suffix(obj)
 
@@ -122,20 +258,50 @@ def gather_models(apply_modifiers: bool, export_target: str, skeleton_only: bool
                 valid_vgroup_indices = { group.index for group in valid_vgroups }
                 model.bone_map = [ group.name for group in valid_vgroups ]
 
-            mesh = obj.to_mesh()
-            model.geometry = create_mesh_geometry(mesh, valid_vgroup_indices)
-
-            obj.to_mesh_clear()
-
             _, _, world_scale = obj.matrix_world.decompose()
             world_scale = convert_scale_space(world_scale)
-            scale_segments(world_scale, model.geometry)
-                
-            for segment in model.geometry:
-                if len(segment.positions) > MAX_MSH_VERTEX_COUNT:
-                    raise RuntimeError(f"Object '{obj.name}' has resulted in a .msh geometry segment that has "
-                                       f"more than {MAX_MSH_VERTEX_COUNT} vertices! Split the object's mesh up "
-                                       f"and try again!")
+
+            geometry_key = get_shared_geometry_key(uneval_obj, model.model_type, depsgraph is not None,
+                                                   valid_vgroup_indices, world_scale)
+
+            model.shared_geometry_key = geometry_key
+
+            if geometry_key in shared_geometry:
+                segments, cache_key, from_cache = shared_geometry[geometry_key]
+                model.geometry = [copy(segment) for segment in segments]
+            else:
+                mesh = obj.to_mesh()
+
+                cache_key = None
+                from_cache = False
+
+                # Walking the vertex groups is slow, so it's done once for the cache key and the geometry.
+                weight_table = create_vertex_weight_table(mesh, valid_vgroup_indices) if valid_vgroup_indices else None
+
+                if export_cache is not None:
+                    cache_key = create_mesh_cache_key(export_cache, mesh, model, valid_vgroup_indices,
+                                                      world_scale, weld_tolerances, weight_table)
+                    model.geometry = export_cache.get_geometry(cache_key)
+                    from_cache = model.geometry is not None
+
+                if not from_cache:
+                    model.geometry = create_mesh_geometry(mesh, valid_vgroup_indices, world_scale, weld_tolerances,
+                                                          weight_table)
+
+                    # .msh segments can't index more vertices than this, so larger ones are cut into parts.
+                    model.geometry = [part for segment in model.geometry
+                                      for part in split_segment(segment, MAX_MSH_VERTEX_COUNT)]
+
+                obj.to_mesh_clear()
+
+                if geometry_key is not None:
+                    shared_geometry[geometry_key] = ([copy(segment) for segment in model.geometry], cache_key, from_cache)
+
+            if cache_key is not None:
+                export_cache.model_keys[model.name] = cache_key
+
+                if from_cache:
+                    export_cache.processed_models.add(model.name)
 
         if get_is_collision_primitive(obj):
             model.collisionprimitive = get_collision_primitive(obj)
@@ -150,25 +316,303 @@ def gather_models(apply_modifiers: bool, export_target: str, skeleton_only: bool
 
 
 
-def create_parents_set() -> Set[str]:
-    """ Creates a set with the names of the Blender objects from the current scene
-        that have at least one child. """
-        
-    parents = set()
+def get_shared_geometry_key(obj: bpy.types.Object, model_type: ModelType, evaluated: bool,
+                            valid_vgroup_indices: Set[int], scale: Vector) -> Optional[Tuple]:
+    """ Returns a key that is the same for every object whose geometry would come out the
+        same from create_mesh_geometry, or None if the object's geometry can't be shared.
 
-    for obj in bpy.context.scene.objects:
-        if obj.parent is not None:
-            parents.add(obj.parent.name)
+        That's objects using the same mesh with the same model type, vertex groups, scale and materials
+        linked to the object instead of the mesh, as long as their modifiers either aren't applied or
+        they have none, as modifiers can make different geometry for each object. """
+
+    if obj.type != "MESH":
+        return None
 
-    return parents
+    if evaluated and len(obj.modifiers) > 0:
+        return None
+
+    object_materials = tuple((index, slot.material.name_full if slot.material is not None else "")
+                             for index, slot in enumerate(obj.material_slots) if slot.link == "OBJECT")
+
+    return (obj.data.name_full, model_type, frozenset(valid_vgroup_indices), tuple(scale), object_materials)
+
+def create_mesh_cache_key(export_cache: ExportCache, mesh: bpy.types.Mesh, model: Model,
+                          valid_vgroup_indices: Set[int], scale: Vector,
+                          weld_tolerances: VertexWeldTolerances,
+                          weight_table: Optional[Tuple[array, array]]) -> str:
+    """ Creates the export_cache key for the geometry of a model made from an evaluated mesh, from
+        everything create_mesh_geometry and the processing done by create_scene reads.
+        weight_table is the mesh's create_vertex_weight_table, or None if it has no valid vertex groups.
+
+        The mesh's data is hashed as the raw arrays foreach_get pulls from it, which is far
+        cheaper than creating the geometry it stands in for. """
+
+    mesh.calc_loop_triangles()
+
+    def get_array(collection, attribute: str, typecode: str, width: int = 1) -> array:
+        values = array(typecode, bytes(array(typecode).itemsize * len(collection) * width))
+        collection.foreach_get(attribute, values)
+
+        return values
+
+    values = [
+        model.model_type,
+        model.bone_map,
+        tuple(scale),
+        weld_tolerances,
+        sorted(valid_vgroup_indices),
+        [material.name if material is not None else "" for material in mesh.materials],
+        get_array(mesh.vertices, "co", "f", 3),
+        get_array(mesh.loops, "normal", "f", 3),
+        get_array(mesh.polygons, "loop_start", "i"),
+        get_array(mesh.polygons, "loop_total", "i"),
+        get_array(mesh.loop_triangles, "vertices", "i", 3),
+        get_array(mesh.loop_triangles, "loops", "i", 3),
+        get_array(mesh.loop_triangles, "material_index", "i"),
+        get_array(mesh.loop_triangles, "polygon_index", "i"),
+    ]
+
+    uv_layer = mesh.uv_layers.active
+
+    if uv_layer is not None:
+        values.append(get_array(uv_layer.data, "uv", "f", 2))
+
+    active_color = mesh.color_attributes.active_color
+
+    if active_color is not None:
+        values.append(active_color.domain)
+        values.append(get_array(active_color.data, "color", "f", 4))
+
+    if weight_table is not None:
+        values.extend(weight_table)
+
+    return export_cache.create_key(*values)
+
+def create_mesh_geometry(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int], scale: Vector = None,
+                         weld_tolerances: VertexWeldTolerances = None,
+                         weight_table: Tuple[array, array] = None) -> List[GeometrySegment]:
+    """ Creates a list of GeometrySegment objects from a Blender mesh, with positions
+        scaled by scale (in .msh space) if it isn't None. weight_table is the mesh's
+        create_vertex_weight_table, which is created here if it is None.
+
+        Corners of the mesh's triangles become one vertex when all their attributes match,
+        or land in the same cells once snapped to grids with weld_tolerances as their spacing
+        if it isn't None (see VertexWeldTolerances). A welded vertex takes its attributes
+        from the first corner it was made from. Triangles left with a repeated vertex are removed.
 
-def create_mesh_geometry(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int]) -> List[GeometrySegment]:
-    """ Creates a list of GeometrySegment objects from a Blender mesh.
         Does NOT create triangle strips in the GeometrySegment however. """
 
     mesh.validate_material_indices()
     mesh.calc_loop_triangles()
 
+    if weld_tolerances is None:
+        weld_tolerances = VertexWeldTolerances()
+
+    if weight_table is None and valid_vgroup_indices:
+        weight_table = create_vertex_weight_table(mesh, valid_vgroup_indices)
+
+    if numpy is not None:
+        segments = create_mesh_geometry_numpy(mesh, valid_vgroup_indices, scale, weld_tolerances, weight_table)
+    else:
+        segments = create_mesh_geometry_python(mesh, valid_vgroup_indices, weld_tolerances, weight_table)
+
+        if scale is not None:
+            scale_segments(scale, segments)
+
+    for segment in segments:
+        remove_degenerate_triangles(segment)
+
+    return segments
+
+def create_vertex_weight_table(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int]) -> Tuple[array, array]:
+    """ Creates a table of each vertex's skin weights, from its vertex groups in valid_vgroup_indices,
+        so the vertex groups are only walked once per vertex instead of for every corner using it.
+
+        Only the MAX_VERTEX_WEIGHTS largest weights of a vertex are kept, largest first and normalized
+        to add up to 1.0, as they will be in the .msh file. Returns (vertex group indices, weights) as
+        flat arrays of 'i' and 'd' with MAX_VERTEX_WEIGHTS entries for each vertex, padded with group
+        index -1 and weight 0.0. """
+
+    vertex_groups = array("i")
+    vertex_weights = array("d")
+
+    padding = [(-1, 0.0)] * MAX_VERTEX_WEIGHTS
+
+    for vertex in mesh.vertices:
+        weights = sorted(((group.group, group.weight) for group in vertex.groups if group.group in valid_vgroup_indices),
+                         key=lambda weight: weight[1], reverse=True)[:MAX_VERTEX_WEIGHTS]
+
+        total_weight = max(sum(weight for _, weight in weights), 1e-5)
+
+        weights = [(group, weight / total_weight) for group, weight in weights] + padding[len(weights):]
+
+        vertex_groups.extend(group for group, _ in weights)
+        vertex_weights.extend(weight for _, weight in weights)
+
+    return vertex_groups, vertex_weights
+
+def create_mesh_geometry_numpy(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int], scale: Vector,
+                               weld_tolerances: VertexWeldTolerances,
+                               weight_table: Tuple[array, array]) -> List[GeometrySegment]:
+    """ create_mesh_geometry using NumPy arrays pulled from the mesh with foreach_get.
+
+        Gives the same segments as create_mesh_geometry_python (except for the
+        order of polygons) in a fraction of the time on large meshes. """
+
+    material_count = max(len(mesh.materials), 1)
+
+    segments: List[GeometrySegment] = [GeometrySegment() for i in range(material_count)]
+
+    active_color = mesh.color_attributes.active_color
+    uv_layer = mesh.uv_layers.active
+
+    if active_color is not None:
+        for segment in segments:
+            segment.colors = []
+
+    if valid_vgroup_indices:
+        for segment in segments:
+            segment.weights = []
+
+    for segment, material in zip(segments, mesh.materials):
+        segment.material_name = material.name
+
+    triangle_count = len(mesh.loop_triangles)
+
+    if triangle_count == 0:
+        return segments
+
+    def get_array(collection, attribute: str, dtype, count: int, width: int = 1):
+        values = numpy.empty(count * width, dtype=dtype)
+        collection.foreach_get(attribute, values)
+
+        return values.reshape(-1, width) if width > 1 else values
+
+    vertex_positions = get_array(mesh.vertices, "co", numpy.float32, len(mesh.vertices), 3)
+    # always use loop normals since we always calculate a custom split set
+    loop_normals = get_array(mesh.loops, "normal", numpy.float32, len(mesh.loops), 3)
+
+    # Everything below works on the triangles' corners, in the order of the
+    # triangles and then of the corners within each triangle.
+    corner_vertices = get_array(mesh.loop_triangles, "vertices", numpy.int32, triangle_count, 3).ravel()
+    corner_loops = get_array(mesh.loop_triangles, "loops", numpy.int32, triangle_count, 3).ravel()
+    triangle_materials = get_array(mesh.loop_triangles, "material_index", numpy.int32, triangle_count)
+    triangle_polygons = get_array(mesh.loop_triangles, "polygon_index", numpy.int32, triangle_count)
+
+    corner_attributes = [vertex_positions[corner_vertices], loop_normals[corner_loops]]
+    attribute_tolerances = [weld_tolerances.position, weld_tolerances.normal]
+
+    if uv_layer is not None:
+        loop_uvs = get_array(uv_layer.data, "uv", numpy.float32, len(uv_layer.data), 2)
+        corner_attributes.append(loop_uvs[corner_loops])
+        attribute_tolerances.append(weld_tolerances.texcoord)
+
+    if active_color is not None:
+        colors = get_array(active_color.data, "color", numpy.float32, len(active_color.data), 4)
+        corner_attributes.append(colors[corner_loops if active_color.domain == "CORNER" else corner_vertices])
+        attribute_tolerances.append(weld_tolerances.color)
+
+    corner_materials = numpy.repeat(triangle_materials, 3)
+
+    def get_key_columns(attribute, tolerance: float):
+        if tolerance > 0.0:
+            return numpy.round(attribute.astype(numpy.float64) / tolerance).astype(numpy.int64)
+
+        # Exact bits of the values. Adding 0.0 turns -0.0 into 0.0, as
+        # they compare equal but don't have the same bits.
+        bits_type = numpy.uint32 if attribute.dtype == numpy.float32 else numpy.uint64
+
+        return (attribute + attribute.dtype.type(0.0)).view(bits_type).astype(numpy.int64)
+
+    # Build a row per corner of its material and (quantized) attributes, so corners
+    # are only merged into one vertex when everything matches.
+    key_columns = [corner_materials.astype(numpy.int64).reshape(-1, 1)]
+    key_columns.extend(get_key_columns(attribute, tolerance)
+                       for attribute, tolerance in zip(corner_attributes, attribute_tolerances))
+
+    if valid_vgroup_indices:
+        # Vertex groups can't be read with foreach_get, so they come from the weight table instead.
+        vertex_groups, vertex_weights = weight_table
+
+        vertex_groups = numpy.frombuffer(vertex_groups, dtype=numpy.int32).astype(numpy.int64).reshape(-1, MAX_VERTEX_WEIGHTS)
+        vertex_weights = numpy.frombuffer(vertex_weights, dtype=numpy.float64).reshape(-1, MAX_VERTEX_WEIGHTS)
+
+        key_columns.append(vertex_groups[corner_vertices])
+        key_columns.append(get_key_columns(vertex_weights[corner_vertices], weld_tolerances.weight))
+
+    corner_keys = numpy.ascontiguousarray(numpy.concatenate(key_columns, axis=1))
+
+    _, first_corners, corner_unique = numpy.unique(corner_keys, axis=0, return_index=True, return_inverse=True)
+    corner_unique = corner_unique.reshape(-1)
+
+    # Number each segment's vertices in the order their first corner appears.
+    unique_order = numpy.argsort(first_corners, kind="stable")
+    unique_materials = corner_materials[first_corners]
+    unique_segment_index = numpy.empty(len(first_corners), dtype=numpy.int64)
+
+    positions = numpy.stack((-vertex_positions[:, 0], vertex_positions[:, 2], vertex_positions[:, 1]), axis=1)
+
+    if scale is not None:
+        positions *= numpy.array(scale, dtype=numpy.float32)
+
+    normals = numpy.stack((-loop_normals[:, 0], loop_normals[:, 2], loop_normals[:, 1]), axis=1)
+
+    for material_index, segment in enumerate(segments):
+        segment_uniques = unique_order[unique_materials[unique_order] == material_index]
+
+        if len(segment_uniques) == 0:
+            continue
+
+        unique_segment_index[segment_uniques] = numpy.arange(len(segment_uniques))
+
+        vertex_corners = first_corners[segment_uniques]
+
+        segment.positions = [Vector(position) for position in positions[corner_vertices[vertex_corners]].tolist()]
+        segment.normals = [Vector(normal) for normal in normals[corner_loops[vertex_corners]].tolist()]
+
+        if uv_layer is not None:
+            segment.texcoords = [Vector(uv) for uv in loop_uvs[corner_loops[vertex_corners]].tolist()]
+        else:
+            segment.texcoords = [Vector((0.0, 0.0)) for _ in range(len(vertex_corners))]
+
+        if active_color is not None:
+            segment.colors = corner_attributes[-1][vertex_corners].tolist()
+
+        if valid_vgroup_indices:
+            segment_vertices = corner_vertices[vertex_corners]
+
+            segment.weights = [[VertexWeight(weight, group) for group, weight in zip(groups, weights) if group >= 0]
+                               for groups, weights in zip(vertex_groups[segment_vertices].tolist(),
+                                                          vertex_weights[segment_vertices].tolist())]
+
+    corner_indices = unique_segment_index[corner_unique]
+
+    # Every loop of a polygon is a corner of one of its triangles.
+    loop_indices = numpy.empty(len(mesh.loops), dtype=numpy.int64)
+    loop_indices[corner_loops] = corner_indices
+
+    triangle_indices = corner_indices.reshape(-1, 3)
+
+    polygon_loop_starts = get_array(mesh.polygons, "loop_start", numpy.int32, len(mesh.polygons))
+    polygon_loop_totals = get_array(mesh.polygons, "loop_total", numpy.int32, len(mesh.polygons))
+
+    for material_index, segment in enumerate(segments):
+        material_triangles = triangle_materials == material_index
+
+        segment.triangles = triangle_indices[material_triangles].tolist()
+
+        for polygon_index in numpy.unique(triangle_polygons[material_triangles]).tolist():
+            loop_start = polygon_loop_starts[polygon_index]
+
+            segment.polygons.append(loop_indices[loop_start:loop_start + polygon_loop_totals[polygon_index]].tolist())
+
+    return segments
+
+def create_mesh_geometry_python(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int],
+                                weld_tolerances: VertexWeldTolerances,
+                                weight_table: Tuple[array, array]) -> List[GeometrySegment]:
+    """ create_mesh_geometry for when NumPy isn't available, one loop at a time. """
+
     material_count = max(len(mesh.materials), 1)
 
     segments: List[GeometrySegment] = [GeometrySegment() for i in range(material_count)]
@@ -187,6 +631,16 @@ def create_mesh_geometry(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int]) -
     for segment, material in zip(segments, mesh.materials):
         segment.material_name = material.name
 
+    if valid_vgroup_indices:
+        vertex_groups, vertex_weights = weight_table
+
+        def get_weight_row(table: array, vertex_index: int) -> array:
+            return table[vertex_index * MAX_VERTEX_WEIGHTS:(vertex_index + 1) * MAX_VERTEX_WEIGHTS]
+
+        vertex_weight_keys = [tuple(get_weight_row(vertex_groups, i)) +
+                              tuple(quantize(weight, weld_tolerances.weight) for weight in get_weight_row(vertex_weights, i))
+                              for i in range(len(mesh.vertices))]
+
     def add_vertex(material_index: int, vertex_index: int, loop_index: int) -> int:
         nonlocal segments, vertex_remap
 
@@ -199,30 +653,27 @@ def create_mesh_geometry(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int]) -
         vertex_normal = Vector( mesh.loops[loop_index].normal )
 
         def get_cache_vertex():
-            yield mesh.vertices[vertex_index].co.x
-            yield mesh.vertices[vertex_index].co.y
-            yield mesh.vertices[vertex_index].co.z
+            yield quantize(mesh.vertices[vertex_index].co.x, weld_tolerances.position)
+            yield quantize(mesh.vertices[vertex_index].co.y, weld_tolerances.position)
+            yield quantize(mesh.vertices[vertex_index].co.z, weld_tolerances.position)
 
-            yield vertex_normal.x
-            yield vertex_normal.y
-            yield vertex_normal.z
+            yield quantize(vertex_normal.x, weld_tolerances.normal)
+            yield quantize(vertex_normal.y, weld_tolerances.normal)
+            yield quantize(vertex_normal.z, weld_tolerances.normal)
 
             if mesh.uv_layers.active is not None:
-                yield mesh.uv_layers.active.data[loop_index].uv.x
-                yield mesh.uv_layers.active.data[loop_index].uv.y
+                yield quantize(mesh.uv_layers.active.data[loop_index].uv.x, weld_tolerances.texcoord)
+                yield quantize(mesh.uv_layers.active.data[loop_index].uv.y, weld_tolerances.texcoord)
 
             if segment.colors is not None:
                 active_color = mesh.color_attributes.active_color
                 data_index = loop_index if active_color.domain == "CORNER" else vertex_index
 
                 for v in mesh.color_attributes.active_color.data[data_index].color:
-                    yield v
+                    yield quantize(v, weld_tolerances.color)
 
             if segment.weights is not None:
-                for v in mesh.vertices[vertex_index].groups:
-                    if v.group in valid_vgroup_indices:                    
-                        yield v.group
-                        yield v.weight
+                yield vertex_weight_keys[vertex_index]
 
         vertex_cache_entry = tuple(get_cache_vertex())
         cached_vertex_index = cache.get(vertex_cache_entry, vertex_cache_miss_index)
@@ -251,8 +702,9 @@ def create_mesh_geometry(mesh: bpy.types.Mesh, valid_vgroup_indices: Set[int]) -
             segment.colors.append(list(active_color.data[data_index].color))
 
         if segment.weights is not None:
-            groups = mesh.vertices[vertex_index].groups
-            segment.weights.append([VertexWeight(v.weight, v.group) for v in groups if v.group in valid_vgroup_indices])
+            segment.weights.append([VertexWeight(weight, group) for group, weight
+                                    in zip(get_weight_row(vertex_groups, vertex_index),
+                                           get_weight_row(vertex_weights, vertex_index)) if group >= 0])
 
         return new_index
 
@@ -402,7 +854,7 @@ def check_for_bad_lod_suffix(obj: bpy.types.Object):
         if name.endswith(f"_lod{i}"):
             raise RuntimeError(failure_message)
 
-def select_objects(export_target: str) -> List[bpy.types.Object]:
+def select_objects(export_target: str, scene_graph: SceneGraph = None) -> List[bpy.types.Object]:
     """ Returns a list of objects to export. """
 
     if export_target == "SCENE" or not export_target in {"SELECTED", "SELECTED_WITH_CHILDREN"}:
@@ -412,14 +864,17 @@ def select_objects(export_target: str) -> List[bpy.types.Object]:
     added = {obj.name for obj in objects}
 
     if export_target == "SELECTED_WITH_CHILDREN":
+        if scene_graph is None:
+            scene_graph = create_scene_graph()
+
         children = []
 
         def add_children(parent):
             nonlocal children
             nonlocal added
 
-            for obj in bpy.context.scene.objects:
-                if obj.parent == parent and obj.name not in added:
+            for obj in scene_graph.children.get(parent.name, ()):
+                if obj.name not in added:
                     children.append(obj)
                     added.add(obj.name)
 
@@ -453,12 +908,26 @@ def select_objects(export_target: str) -> List[bpy.types.Object]:
 
 
 
-def expand_armature(armature: bpy.types.Object) -> Dict[str, Model]:
+def expand_armature(armature: bpy.types.Object, scene_graph: SceneGraph = None) -> Dict[str, Model]:
 
     proper_BONES = get_real_BONES(armature)
 
     bones: Dict[str, Model] = {}
 
+    # The object root bones are parented to is the same for every root bone, so find it once.
+    # Object.children is ordered by name, so the scene graph's children are too to pick the same one.
+    if scene_graph is not None:
+        armature_children = sorted(scene_graph.children.get(armature.original.name, ()), key=lambda obj: obj.name)
+    else:
+        armature_children = armature.original.children
+
+    skin_obj = None
+
+    for child_obj in armature_children:
+        if child_obj.vertex_groups and not get_is_model_hidden(child_obj) and not child_obj.parent_bone:
+            skin_obj = child_obj
+            break
+
     for bone in armature.data.bones:
         model = Model()
 
@@ -473,13 +942,7 @@ def expand_armature(armature: bpy.types.Object) -> Dict[str, Model]:
         else:
 
             bone_world_matrix = get_bone_world_matrix(armature, bone.name)
-            parent_obj = None
-
-            for child_obj in armature.original.children:
-                if child_obj.vertex_groups and not get_is_model_hidden(child_obj) and not child_obj.parent_bone:
-                    #model.parent = child_obj.name
-                    parent_obj = child_obj
-                    break
+            parent_obj = skin_obj
 
             if parent_obj:
                 transform = parent_obj.matrix_world.inverted() @ bone_world_matrix
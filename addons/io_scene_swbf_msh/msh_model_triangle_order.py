@@ -0,0 +1,229 @@
+""" Contains triangle reordering functions for GeometrySegment, to reduce overdraw
+    while keeping good post-transform vertex cache use.
+
+    Based on "Fast Triangle Reordering for Vertex Locality and Reduced Overdraw"
+    (Sander, Nehab and Barczak, 2007): triangles are first ordered for the vertex cache
+    with Tipsify, the result is cut into clusters and the clusters are sorted so the
+    ones facing away from the mesh's centre, which are the most likely to occlude
+    the rest, are drawn first. """
+
+import math
+
+from typing import List, Tuple
+from .msh_model import *
+from .msh_model_triangle_strips import VertexCache
+
+# Clusters are cut once their own average cache miss ratio falls to this. Lower makes fewer,
+# larger clusters that use the vertex cache better but give the sorting less to work with.
+DEFAULT_CLUSTER_ACMR: float = 0.75
+
+def reorder_models_triangles_for_overdraw(models: List[Model], cache_size: int,
+                                          cluster_acmr: float = DEFAULT_CLUSTER_ACMR) -> List[Model]:
+    """ Reorders the triangles of the STATIC models in a list to reduce overdraw. """
+
+    for model in models:
+        if model.model_type != ModelType.STATIC or model.geometry is None:
+            continue
+
+        for segment in model.geometry:
+            segment.triangles, segment.triangle_clusters = reorder_triangles_for_overdraw(segment, cache_size,
+                                                                                          cluster_acmr)
+
+    return models
+
+def reorder_triangles_for_overdraw(segment: GeometrySegment, cache_size: int,
+                                   cluster_acmr: float = DEFAULT_CLUSTER_ACMR) -> Tuple[List[List[int]], List[int]]:
+    """ Returns the triangles of a segment reordered to reduce overdraw and the position in
+        them where each cluster starts, for GeometrySegment.triangle_clusters. """
+
+    triangles = segment.triangles
+
+    if len(triangles) < 2:
+        return triangles, None
+
+    ordered, hard_boundaries = tipsify(triangles, len(segment.positions), cache_size)
+    clusters = split_clusters(ordered, hard_boundaries, cache_size, cluster_acmr)
+
+    mesh_centroid = _get_centroid(segment, ordered)
+
+    def sort_key(cluster: List[List[int]]) -> float:
+        centroid = _get_centroid(segment, cluster)
+        normal = _get_normal(segment, cluster)
+
+        return sum((c - m) * n for c, m, n in zip(centroid, mesh_centroid, normal))
+
+    clusters.sort(key=sort_key, reverse=True)
+
+    cluster_starts: List[int] = []
+    reordered: List[List[int]] = []
+
+    for cluster in clusters:
+        cluster_starts.append(len(reordered))
+        reordered += cluster
+
+    return reordered, cluster_starts
+
+def tipsify(triangles: List[List[int]], vertex_count: int, cache_size: int) -> Tuple[List[List[int]], List[int]]:
+    """ Orders triangles for a vertex cache of cache_size vertices by emitting all
+        the triangles around a vertex at a time.
+
+        Returns (ordered triangles, positions in the ordered triangles where the order
+        had to jump to an unconnected part of the mesh). """
+
+    vertex_triangles: List[List[int]] = [[] for _ in range(vertex_count)]
+
+    for i, triangle in enumerate(triangles):
+        for vertex in triangle:
+            vertex_triangles[vertex].append(i)
+
+    live_triangles = [len(adjacent) for adjacent in vertex_triangles]
+    cache_time = [0] * vertex_count
+    dead_end: List[int] = []
+    emitted = bytearray(len(triangles))
+
+    ordered: List[List[int]] = []
+    hard_boundaries: List[int] = []
+
+    fanning_vertex = 0
+    time = cache_size + 1
+    cursor = 0
+
+    while fanning_vertex >= 0:
+        candidates = set()
+
+        for triangle in vertex_triangles[fanning_vertex]:
+            if emitted[triangle]:
+                continue
+
+            for vertex in triangles[triangle]:
+                dead_end.append(vertex)
+                candidates.add(vertex)
+                live_triangles[vertex] -= 1
+
+                if time - cache_time[vertex] > cache_size:
+                    cache_time[vertex] = time
+                    time += 1
+
+            emitted[triangle] = True
+            ordered.append(triangles[triangle])
+
+        # Next fan around the candidate that will stay in the cache the longest while
+        # all of its remaining triangles are emitted.
+        fanning_vertex = -1
+        best_priority = -1
+
+        for vertex in candidates:
+            if live_triangles[vertex] <= 0:
+                continue
+
+            priority = 0
+
+            if time - cache_time[vertex] + 2 * live_triangles[vertex] <= cache_size:
+                priority = time - cache_time[vertex]
+
+            if priority > best_priority:
+                best_priority = priority
+                fanning_vertex = vertex
+
+        if fanning_vertex == -1:
+            # Dead end, continue from a recently used vertex or failing that the next
+            # vertex in the mesh with triangles left.
+            while dead_end and fanning_vertex == -1:
+                vertex = dead_end.pop()
+
+                if live_triangles[vertex] > 0:
+                    fanning_vertex = vertex
+
+            while fanning_vertex == -1 and cursor < vertex_count:
+                if live_triangles[cursor] > 0:
+                    fanning_vertex = cursor
+
+                cursor += 1
+
+            if fanning_vertex != -1:
+                hard_boundaries.append(len(ordered))
+
+    return ordered, hard_boundaries
+
+def split_clusters(ordered: List[List[int]], hard_boundaries: List[int], cache_size: int,
+                   cluster_acmr: float) -> List[List[List[int]]]:
+    """ Cuts triangles ordered by tipsify into clusters at its hard boundaries, and within
+        those wherever a cluster's own average cache miss ratio has fallen to cluster_acmr. """
+
+    clusters: List[List[List[int]]] = []
+
+    starts = [0] + [boundary for boundary in hard_boundaries if 0 < boundary < len(ordered)]
+    ends = starts[1:] + [len(ordered)]
+
+    for start, end in zip(starts, ends):
+        cluster: List[List[int]] = []
+        cache = VertexCache(cache_size)
+        misses = 0
+
+        for triangle in ordered[start:end]:
+            cluster.append(triangle)
+            misses += sum(1 for index in triangle if cache.add(index))
+
+            # A cluster starts with a cold cache once the clusters are sorted,
+            # so simulate each one from an empty cache.
+            if len(cluster) > 1 and misses <= cluster_acmr * len(cluster):
+                clusters.append(cluster)
+                cluster = []
+                cache = VertexCache(cache_size)
+                misses = 0
+
+        if cluster:
+            clusters.append(cluster)
+
+    return clusters
+
+def _get_centroid(segment: GeometrySegment, triangles: List[List[int]]) -> Tuple[float, float, float]:
+    """ Area weighted centroid of triangles. """
+
+    total_area = 0.0
+    centroid = [0.0, 0.0, 0.0]
+
+    for triangle in triangles:
+        a, b, c = (segment.positions[index] for index in triangle)
+        area = _get_triangle_area(a, b, c)
+
+        for i in range(3):
+            centroid[i] += (a[i] + b[i] + c[i]) / 3.0 * area
+
+        total_area += area
+
+    if total_area == 0.0:
+        return (0.0, 0.0, 0.0)
+
+    return tuple(component / total_area for component in centroid)
+
+def _get_normal(segment: GeometrySegment, triangles: List[List[int]]) -> Tuple[float, float, float]:
+    """ Average normal of triangles, from their vertex normals weighted by triangle area. """
+
+    normal = [0.0, 0.0, 0.0]
+
+    for triangle in triangles:
+        area = _get_triangle_area(*(segment.positions[index] for index in triangle))
+
+        for index in triangle:
+            vertex_normal = segment.normals[index]
+
+            for i in range(3):
+                normal[i] += vertex_normal[i] * area
+
+    length = math.sqrt(sum(component * component for component in normal))
+
+    if length == 0.0:
+        return (0.0, 0.0, 0.0)
+
+    return tuple(component / length for component in normal)
+
+def _get_triangle_area(a, b, c) -> float:
+    ab = (b[0] - a[0], b[1] - a[1], b[2] - a[2])
+    ac = (c[0] - a[0], c[1] - a[1], c[2] - a[2])
+
+    cross = (ab[1] * ac[2] - ab[2] * ac[1],
+             ab[2] * ac[0] - ab[0] * ac[2],
+             ab[0] * ac[1] - ab[1] * ac[0])
+
+    return 0.5 * math.sqrt(cross[0] * cross[0] + cross[1] * cross[1] + cross[2] * cross[2])
@@ -1,81 +1,498 @@
 """ Contains triangle strip generation functions for GeometrySegment. """
 
-from typing import List, Tuple
-from copy import deepcopy
+import heapq
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List, Tuple, Dict, Set, Iterable, Iterator
 from .msh_model import *
+from .msh_process_pool import map_in_pool
+from .msh_strip_cache import TriangleStripCache
+from .msh_strip_statistics import SegmentStripStatistics, create_segment_strip_statistics, is_triangle_list_cheaper, count_vertex_cache_misses, get_index_cost
+
+# Post-transform vertex cache size to optimize strips for when none is specified.
+DEFAULT_VERTEX_CACHE_SIZE: int = 16
+
+# Fewer triangles than this in an export are stripped faster than a process pool can be started.
+PARALLEL_MIN_TRIANGLES: int = 50000
+
+def create_models_triangle_strips(models: List[Model], optimize_for_vertex_cache: bool = False,
+                                  vertex_cache_size: int = DEFAULT_VERTEX_CACHE_SIZE,
+                                  statistics: List[SegmentStripStatistics] = None,
+                                  strip_cache: TriangleStripCache = None) -> List[Model]:
+    """ Create the triangle strips for a list of models geometry.
+
+        Strips of segments with triangle_clusters are made within each cluster, in the order of
+        the clusters. Segments whose triangle list is cheaper to draw than the generated strips (see
+        is_triangle_list_cheaper) get their triangles as strips instead. If statistics
+        is not None the statistics for each segment are appended to it. If strip_cache is
+        not None strips are reused from and saved to it, and it is pruned if any were saved.
+
+        When there are enough triangles to be worth it strips are generated in a process pool. """
+
+    if optimize_for_vertex_cache:
+        strip_mode = f"vertex_cache:{vertex_cache_size}"
+    else:
+        strip_mode = "fast"
+
+    model_segments = [(model, segment) for model in models if model.geometry is not None
+                      for segment in model.geometry]
+
+    segment_strips: List[List[List[int]]] = [None] * len(model_segments)
+    cache_keys: List[str] = [None] * len(model_segments)
+
+    if strip_cache is not None:
+        for i, (_, segment) in enumerate(model_segments):
+            cache_keys[i] = strip_cache.get_key(segment.triangles, strip_mode, segment.triangle_clusters)
+            segment_strips[i] = strip_cache.load(cache_keys[i])
+
+    uncached = [i for i, strips in enumerate(segment_strips) if strips is None]
+
+    uncached_segments = [(model_segments[i][1].triangles, model_segments[i][1].triangle_clusters) for i in uncached]
+
+    for i, strips in zip(uncached, _create_segments_triangle_strips(uncached_segments, optimize_for_vertex_cache,
+                                                                    vertex_cache_size)):
+        segment_strips[i] = strips
+
+        if strip_cache is not None:
+            strip_cache.store(cache_keys[i], strips)
+
+    if strip_cache is not None and uncached:
+        strip_cache.prune()
 
-def create_models_triangle_strips(models: List[Model]) -> List[Model]:
-    """ Create the triangle strips for a list of models geometry. """
+    for (model, segment), strips in zip(model_segments, segment_strips):
+        uses_triangle_list = is_triangle_list_cheaper(segment.triangles, strips, vertex_cache_size)
 
-    for model in models:
-        if model.geometry is not None:
-            for segment in model.geometry:
-                segment.triangle_strips = create_triangle_strips(segment.triangles)
+        if statistics is not None:
+            segment_statistics = create_segment_strip_statistics(segment.triangles, strips, model.name, segment.material_name)
+            segment_statistics.uses_triangle_list = uses_triangle_list
+
+            statistics.append(segment_statistics)
+
+        segment.triangle_strips = segment.triangles if uses_triangle_list else strips
 
     return models
 
+def create_segment_triangle_strips(segment_triangles: List[List[int]], optimize_for_vertex_cache: bool,
+                                   vertex_cache_size: int, triangle_clusters: List[int] = None) -> List[List[int]]:
+    """ Create the triangle strips for a segment's triangles with the strip generator selected
+        by optimize_for_vertex_cache.
+
+        If triangle_clusters is not None (see GeometrySegment.triangle_clusters) strips are
+        made within each cluster and returned in the order of the clusters. """
+
+    if triangle_clusters is None:
+        triangle_clusters = [0]
+
+    cluster_ends = triangle_clusters[1:] + [len(segment_triangles)]
+    strips: List[List[int]] = []
+
+    for start, end in zip(triangle_clusters, cluster_ends):
+        cluster_triangles = segment_triangles[start:end]
+
+        if optimize_for_vertex_cache:
+            strips += create_vertex_cache_triangle_strips(cluster_triangles, vertex_cache_size)
+        else:
+            strips += create_triangle_strips(cluster_triangles)
+
+    return strips
+
+def _create_segment_triangle_strips(segment: Tuple[List[List[int]], List[int]], optimize_for_vertex_cache: bool,
+                                    vertex_cache_size: int) -> List[List[int]]:
+    """ create_segment_triangle_strips for a (triangles, triangle_clusters) pair.
+        This is what process pool workers run for each segment. """
+
+    triangles, triangle_clusters = segment
+
+    return create_segment_triangle_strips(triangles, optimize_for_vertex_cache, vertex_cache_size, triangle_clusters)
+
+def _create_segments_triangle_strips(segments: List[Tuple[List[List[int]], List[int]]], optimize_for_vertex_cache: bool,
+                                     vertex_cache_size: int) -> Iterator[List[List[int]]]:
+    """ Yields the triangle strips for each (triangles, triangle_clusters) pair in segments, in order. """
+
+    return map_in_pool(partial(_create_segment_triangle_strips, optimize_for_vertex_cache=optimize_for_vertex_cache,
+                               vertex_cache_size=vertex_cache_size),
+                       segments, [len(triangles) for triangles, _ in segments], PARALLEL_MIN_TRIANGLES)
+
 def create_triangle_strips(segment_triangles: List[List[int]]) -> List[List[int]]:
     """ Create the triangle strips for a list of triangles. """
 
-    triangles = deepcopy(segment_triangles)
+    # The general idea here is we create a new strip starting from the first
+    # triangle not yet in a strip until every triangle is in one.
+    #
+    # A strip is extended by looking up a triangle sharing the strip's last edge
+    # in 'edge_triangles', keeping the winding of every triangle in the strip the
+    # same as in 'segment_triangles'. The starting triangle is tried in each of its
+    # three rotations and the longest of the resulting strips is kept.
+
+    edge_triangles = create_edge_triangles_index(segment_triangles)
+    used = bytearray(len(segment_triangles))
     strips: List[List[int]] = []
 
-    # The general idea here is we loop based off if 'triangles' is empty or not.
+    for first_triangle in range(len(segment_triangles)):
+        if used[first_triangle]:
+            continue
+
+        best_strip: List[int] = None
+        best_strip_triangles: List[int] = None
+
+        for rotation in range(3):
+            strip, strip_triangles = grow_strip(segment_triangles, edge_triangles, used, first_triangle, rotation)
+
+            if best_strip is None or len(strip) > len(best_strip):
+                best_strip = strip
+                best_strip_triangles = strip_triangles
+
+        for triangle in best_strip_triangles:
+            used[triangle] = True
+
+        strips.append(best_strip)
+
+    return strips
+
+@dataclass
+class TriangleAdjacency:
+    """ Indices of how a list of triangles connect, for create_vertex_cache_triangle_strips.
+
+        Triangle edges are numbered triangle * 3 + i, for the edge starting at the triangle's i'th vertex. """
+
+    # See create_edge_triangles_index.
+    edge_triangles: Dict[Tuple[int, int], List[Tuple[int, int]]] = field(default_factory=dict)
+
+    # Triangles using each vertex, once for each of their corners using it.
+    vertex_corners: Dict[int, List[int]] = field(default_factory=dict)
+
+    # Edges of other triangles running the opposite way along each triangle edge.
+    edge_neighbours: List[List[int]] = field(default_factory=list)
+
+    # Number of edges of each triangle with at least one neighbour.
+    neighbour_counts: List[int] = field(default_factory=list)
+
+def create_triangle_adjacency(triangles: List[List[int]]) -> TriangleAdjacency:
+    """ Creates the TriangleAdjacency for a list of triangles. """
+
+    adjacency = TriangleAdjacency()
+    adjacency.edge_triangles = create_edge_triangles_index(triangles)
+
+    vertex_corners: Dict[int, List[int]] = defaultdict(list)
+    edge_indices: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+    for i, tri in enumerate(triangles):
+        v0, v1, v2 = tri[0], tri[1], tri[2]
+
+        vertex_corners[v0].append(i)
+        vertex_corners[v1].append(i)
+        vertex_corners[v2].append(i)
+
+        edge_indices[(v0, v1)].append(i * 3)
+        edge_indices[(v1, v2)].append(i * 3 + 1)
+        edge_indices[(v2, v0)].append(i * 3 + 2)
+
+    no_neighbours: List[int] = []
+    edge_neighbours: List[List[int]] = []
+    neighbour_counts: List[int] = []
+
+    for tri in triangles:
+        v0, v1, v2 = tri[0], tri[1], tri[2]
+
+        neighbours_0 = edge_indices.get((v1, v0), no_neighbours)
+        neighbours_1 = edge_indices.get((v2, v1), no_neighbours)
+        neighbours_2 = edge_indices.get((v0, v2), no_neighbours)
+
+        edge_neighbours.append(neighbours_0)
+        edge_neighbours.append(neighbours_1)
+        edge_neighbours.append(neighbours_2)
+
+        neighbour_counts.append((len(neighbours_0) > 0) + (len(neighbours_1) > 0) + (len(neighbours_2) > 0))
+
+    adjacency.vertex_corners = dict(vertex_corners)
+    adjacency.edge_neighbours = edge_neighbours
+    adjacency.neighbour_counts = neighbour_counts
+
+    return adjacency
+
+def create_vertex_cache_triangle_strips(segment_triangles: List[List[int]],
+                                        cache_size: int = DEFAULT_VERTEX_CACHE_SIZE) -> List[List[int]]:
+    """ Create the triangle strips for a list of triangles, ordered and started
+        to make good use of a FIFO post-transform vertex cache of cache_size vertices.
+
+        Slower than create_triangle_strips, but produces strips with fewer cache misses
+        and usually fewer strips. """
+
+    # Long strips across a mesh wider than the cache get nothing from it, each new
+    # strip finds the vertices it shares with the last one already evicted. Shorter
+    # strips laid next to each other do, but cost more indices. So strips are made
+    # with a few limits on their length relative to the cache size and the result
+    # with the lowest get_index_cost is kept.
+
+    adjacency = create_triangle_adjacency(segment_triangles)
+
+    best_strips: List[List[int]] = None
+    best_cost: float = None
+
+    # Limits and the length (in triangles) of the longest strip made with them, None standing for no limit.
+    longest_strips: List[Tuple[int, int]] = []
+
+    for max_strip_triangles in (None, cache_size // 2, cache_size * 3 // 4, cache_size, cache_size * 3 // 2):
+        if max_strip_triangles is not None and max_strip_triangles < 1:
+            continue
+
+        # A limit no strip made with a higher limit reached gives the same strips
+        # again, which is common on meshes in many small pieces. Skip those.
+        if max_strip_triangles is not None and any(
+                (limit is None or limit > max_strip_triangles) and longest <= max_strip_triangles
+                for limit, longest in longest_strips):
+            continue
+
+        strips = create_vertex_cache_triangle_strips_limited(segment_triangles, adjacency, cache_size, max_strip_triangles)
+
+        longest_strips.append((max_strip_triangles, max((len(strip) - 2 for strip in strips), default=0)))
+
+        cost = get_index_cost(count_vertex_cache_misses((index for strip in strips for index in strip), cache_size),
+                              sum(len(strip) for strip in strips))
+
+        if best_cost is None or cost < best_cost:
+            best_strips = strips
+            best_cost = cost
+
+    return best_strips
+
+def create_vertex_cache_triangle_strips_limited(segment_triangles: List[List[int]],
+                                                adjacency: TriangleAdjacency,
+                                                cache_size: int,
+                                                max_strip_triangles: int) -> List[List[int]]:
+    """ Create the triangle strips for create_vertex_cache_triangle_strips, with each strip
+        limited to max_strip_triangles triangles (unless it is None). """
+
+    # Like create_triangle_strips, but instead of starting each strip from the first
+    # triangle not yet in a strip the next strip is started from a triangle that
+    # shares the most vertices with the simulated cache. Ties are broken by picking
+    # the triangle with the fewest unused neighbours, as those are the ones that
+    # would otherwise be left on their own as single triangle strips.
     #
-    # For each iteration of the loop we create a new strip starting from the first
-    # triangle still in 'triangles'.
+    # Rather than rescanning the triangles around the cache for every strip, each
+    # triangle's number of corners in the cache and number of edges with unused
+    # neighbours are kept up to date as vertices enter and leave the cache and
+    # triangles are used. Whenever a triangle's score improves it is pushed onto
+    # 'candidates'. When it gets worse (a vertex left the cache) its old entry is
+    # left in place and pushed again with the current score once it is popped.
+    # Picking a start triangle then doesn't get slower with the number of strips
+    # or disconnected pieces.
     #
-    # Then we loop, attempting to find a triangle to add the strip each time. If we
-    # find one then we continue the loop, else we break out of it and append the
-    # created strip.
+    # Of the three rotations of the starting triangle the one giving the longest
+    # strip is used, ties are broken by the number of cache misses.
+
+    edge_triangles = adjacency.edge_triangles
+    vertex_corners = adjacency.vertex_corners
+    edge_neighbours = adjacency.edge_neighbours
 
-    def create_strip() -> List[int]:
-        strip: List[int] = [triangles[0][0],
-                            triangles[0][1],
-                            triangles[0][2]]
-        strip_head: Tuple[int, int] = (strip[1], strip[2])
+    used = bytearray(len(segment_triangles))
+    cache = VertexCache(cache_size)
+    strips: List[List[int]] = []
 
-        triangles.remove(triangles[0])
+    cache_hits: List[int] = [0] * len(segment_triangles)
+    unused_edge_neighbours: List[int] = [len(neighbours) for neighbours in edge_neighbours]
+    unused_neighbours: List[int] = list(adjacency.neighbour_counts)
+    candidates: List[Tuple[int, int, int]] = []
 
-        while True:
-            def find_next_vertex():
-                nonlocal triangles
+    next_unused_triangle = 0
 
-                even: bool = len(strip) % 2 == 0
+    heappush = heapq.heappush
 
-                for tri, edge, last_vertex in iterate_triangle_edges_last_vertex(triangles, even):
-                    if edge == strip_head:
-                        triangles.remove(tri)
-                        return last_vertex
+    def use_vertex(vertex: int):
+        if vertex in cache:
+            return
 
-                return None
+        if len(cache.vertices) == cache_size:
+            for triangle in vertex_corners[cache.vertices[0]]:
+                cache_hits[triangle] -= 1
 
-            next_vertex: int = find_next_vertex()
+        cache.add(vertex)
 
-            if next_vertex is None:
-                break
+        for triangle in vertex_corners[vertex]:
+            hits = cache_hits[triangle] + 1
+            cache_hits[triangle] = hits
+
+            if not used[triangle]:
+                heappush(candidates, (-hits, unused_neighbours[triangle], triangle))
+
+    def use_triangle(triangle: int):
+        used[triangle] = True
+
+        for edge in range(triangle * 3, triangle * 3 + 3):
+            for neighbour_edge in edge_neighbours[edge]:
+                unused_edge_neighbours[neighbour_edge] -= 1
+
+                if unused_edge_neighbours[neighbour_edge] > 0:
+                    continue
+
+                neighbour = neighbour_edge // 3
+                unused_neighbours[neighbour] -= 1
+
+                if not used[neighbour] and cache_hits[neighbour] > 0:
+                    heappush(candidates, (-cache_hits[neighbour], unused_neighbours[neighbour], neighbour))
+
+    def find_start_triangle() -> int:
+        nonlocal next_unused_triangle
+
+        while candidates:
+            negative_hits, neighbours, triangle = heapq.heappop(candidates)
+
+            if used[triangle] or cache_hits[triangle] == 0:
+                continue
+
+            if -negative_hits == cache_hits[triangle] and neighbours == unused_neighbours[triangle]:
+                return triangle
+
+            if -negative_hits > cache_hits[triangle]:
+                heapq.heappush(candidates, (-cache_hits[triangle], unused_neighbours[triangle], triangle))
+
+        while used[next_unused_triangle]:
+            next_unused_triangle += 1
+
+        return next_unused_triangle
+
+    remaining_triangles = len(segment_triangles)
+
+    while remaining_triangles:
+        first_triangle = find_start_triangle()
+
+        best_strip: List[int] = None
+        best_strip_triangles: List[int] = None
+        best_misses = 0
+
+        for rotation in range(3):
+            if unused_neighbours[first_triangle] == 0:
+                # Nothing to grow into, the strip is just the rotated triangle.
+                tri = segment_triangles[first_triangle]
+                strip = [tri[rotation], tri[(rotation + 1) % 3], tri[(rotation + 2) % 3]]
+                strip_triangles = [first_triangle]
+            else:
+                strip, strip_triangles = grow_strip(segment_triangles, edge_triangles, used,
+                                                    first_triangle, rotation, max_strip_triangles)
+
+            misses = cache.count_misses(strip)
 
-            strip.append(next_vertex)
-            strip_head = (strip_head[1], next_vertex)
+            if best_strip is None or (len(strip), -misses) > (len(best_strip), -best_misses):
+                best_strip = strip
+                best_strip_triangles = strip_triangles
+                best_misses = misses
 
-        return strip
+        for triangle in best_strip_triangles:
+            use_triangle(triangle)
 
-    while triangles:
-        strips.append(create_strip())
+        for vertex in best_strip:
+            use_vertex(vertex)
+
+        remaining_triangles -= len(best_strip_triangles)
+
+        strips.append(best_strip)
 
     return strips
 
-def iterate_triangle_edges_last_vertex(triangles: List[List[int]], even: bool):
-    """ Generator for iterating through the of each triangle in a list edges.
-        Yields (triangle, edge, last_vertex). """
+class VertexCache:
+    """ Simulation of a FIFO post-transform vertex cache. """
 
-    if even:
-        for tri in triangles:
-            yield tri, (tri[0], tri[1]), tri[2]
-            yield tri, (tri[0], tri[2]), tri[1]
-            yield tri, (tri[1], tri[2]), tri[0]
-    else:
-        for tri in triangles:
-            yield tri, (tri[1], tri[0]), tri[2]
-            yield tri, (tri[2], tri[0]), tri[1]
-            yield tri, (tri[2], tri[1]), tri[0]
+    def __init__(self, size: int):
+        self.size = size
+        self.vertices: deque = deque()
+
+        # When each cached vertex was added, counted in cache misses.
+        self._insert_times: Dict[int, int] = {}
+        self._misses = 0
+
+    def __contains__(self, vertex: int) -> bool:
+        return vertex in self._insert_times
+
+    def add(self, vertex: int) -> bool:
+        """ Uses a vertex, adding it to the cache if it isn't already in it.
+            Returns True if this was a cache miss. """
+
+        if vertex in self._insert_times:
+            return False
+
+        self.vertices.append(vertex)
+        self._insert_times[vertex] = self._misses
+        self._misses += 1
+
+        if len(self.vertices) > self.size:
+            del self._insert_times[self.vertices.popleft()]
+
+        return True
+
+    def count_misses(self, indices: Iterable[int]) -> int:
+        """ Counts the cache misses using the indices would cause, without changing the cache. """
+
+        # A vertex is still cached as long as fewer than 'size' misses came after it was added.
+        new_insert_times: Dict[int, int] = {}
+        misses = 0
+
+        for vertex in indices:
+            insert_time = new_insert_times.get(vertex)
+
+            if insert_time is None:
+                insert_time = self._insert_times.get(vertex)
+
+            if insert_time is not None and self._misses + misses - insert_time <= self.size:
+                continue
+
+            new_insert_times[vertex] = self._misses + misses
+            misses += 1
+
+        return misses
+
+def create_edge_triangles_index(triangles: List[List[int]]) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+    """ Creates a dict mapping each directed edge (in winding order) of the triangles
+        to a list of (triangle index, opposite vertex) for the triangles that have it. """
+
+    edge_triangles: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+
+    for i, tri in enumerate(triangles):
+        v0, v1, v2 = tri[0], tri[1], tri[2]
+
+        edge_triangles.setdefault((v0, v1), []).append((i, v2))
+        edge_triangles.setdefault((v1, v2), []).append((i, v0))
+        edge_triangles.setdefault((v2, v0), []).append((i, v1))
+
+    return edge_triangles
+
+def grow_strip(triangles: List[List[int]],
+               edge_triangles: Dict[Tuple[int, int], List[Tuple[int, int]]],
+               used: bytearray,
+               first_triangle: int,
+               rotation: int,
+               max_triangles: int = None) -> Tuple[List[int], List[int]]:
+    """ Grows a strip from a triangle (rotated so it starts at its 'rotation'th vertex)
+        using triangles that aren't used, up to max_triangles triangles if it isn't None.
+        Returns (strip, indices of the triangles in the strip). """
+
+    tri = triangles[first_triangle]
+
+    strip: List[int] = [tri[rotation], tri[(rotation + 1) % 3], tri[(rotation + 2) % 3]]
+    strip_triangles: List[int] = [first_triangle]
+    in_strip = {first_triangle}
+
+    while max_triangles is None or len(strip_triangles) < max_triangles:
+        # Odd triangles in a strip are wound backwards, so the edge they share
+        # with the strip is reversed in their winding order.
+        if len(strip) % 2 == 0:
+            edge = (strip[-2], strip[-1])
+        else:
+            edge = (strip[-1], strip[-2])
+
+        next_triangle = None
+
+        for triangle, last_vertex in edge_triangles.get(edge, ()):
+            if not used[triangle] and triangle not in in_strip:
+                next_triangle = triangle
+                break
+
+        if next_triangle is None:
+            break
+
+        strip.append(last_vertex)
+        strip_triangles.append(next_triangle)
+        in_strip.add(next_triangle)
+
+    return strip, strip_triangles
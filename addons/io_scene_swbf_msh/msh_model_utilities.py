@@ -1,11 +1,10 @@
 """ Utilities for operating on msh_model objects. """
 
-from typing import List
+from typing import List, Dict, Set, Tuple
 from .msh_model import *
 from .msh_utilities import *
-import mathutils
+from .msh_math import Vector, Quaternion
 import math
-from mathutils import Vector, Matrix
 
 
 
@@ -27,6 +26,128 @@ def validate_geometry_segment(segment : GeometrySegment) -> bool:
 
 
 
+def remove_degenerate_triangles(segment: GeometrySegment):
+    """ Removes the triangles of a segment that use a vertex more than once, which welding
+        vertices can make, and the repeated vertices of its polygons, dropping polygons
+        that are left with fewer than three. """
+
+    segment.triangles = [triangle for triangle in segment.triangles
+                         if triangle[0] != triangle[1] and triangle[1] != triangle[2] and triangle[0] != triangle[2]]
+
+    polygons: List[List[int]] = []
+
+    for polygon in segment.polygons:
+        polygon = [index for i, index in enumerate(polygon) if index != polygon[i - 1]]
+
+        if len(set(polygon)) >= 3:
+            polygons.append(polygon)
+
+    segment.polygons = polygons
+
+def split_segment(segment: GeometrySegment, max_vertex_count: int) -> List[GeometrySegment]:
+    """ Splits a segment with more than max_vertex_count vertices into segments with the same material
+        that each have no more than max_vertex_count. Returns [segment] if it doesn't need splitting.
+
+        The triangles of each polygon stay together, so every part's polygons match its triangles.
+        Polygons are split by recursively cutting them in half at the median of their centres
+        along the longest axis of their bounds, so each part stays spatially coherent. """
+
+    if len(segment.positions) <= max_vertex_count:
+        return [segment]
+
+    groups = _group_triangles_by_polygon(segment)
+
+    group_vertices = [set(polygon).union(*(segment.triangles[triangle] for triangle in triangles))
+                      for polygon, triangles in groups]
+
+    centres = [[sum(segment.positions[index][axis] for index in vertices) / len(vertices) for axis in range(3)]
+               for vertices in group_vertices]
+
+    parts: List[List[int]] = []
+    pending: List[List[int]] = [list(range(len(groups)))]
+
+    while pending:
+        part_groups = pending.pop()
+
+        if len(part_groups) == 1 or len(set().union(*(group_vertices[group] for group in part_groups))) <= max_vertex_count:
+            parts.append(part_groups)
+            continue
+
+        extents = [max(centres[group][axis] for group in part_groups) -
+                   min(centres[group][axis] for group in part_groups) for axis in range(3)]
+        axis = extents.index(max(extents))
+
+        part_groups.sort(key=lambda group: centres[group][axis])
+        middle = len(part_groups) // 2
+
+        pending.append(part_groups[middle:])
+        pending.append(part_groups[:middle])
+
+    return [_create_segment_part(segment, [groups[group] for group in sorted(part)]) for part in parts]
+
+def _group_triangles_by_polygon(segment: GeometrySegment) -> List[Tuple[List[int], List[int]]]:
+    """ Returns (polygon, indices of its triangles) for each polygon of a segment that has triangles.
+
+        A triangle belongs to the polygon that has all of its vertices. Triangles without one are
+        returned with themselves as their polygon. """
+
+    vertex_polygons: Dict[int, List[int]] = {}
+
+    for i, polygon in enumerate(segment.polygons):
+        for index in polygon:
+            vertex_polygons.setdefault(index, []).append(i)
+
+    polygon_vertex_sets = [set(polygon) for polygon in segment.polygons]
+    polygon_triangles: Dict[int, List[int]] = {}
+    groups: List[Tuple[List[int], List[int]]] = []
+
+    for i, triangle in enumerate(segment.triangles):
+        polygon = next((polygon for polygon in vertex_polygons.get(triangle[0], ())
+                        if all(index in polygon_vertex_sets[polygon] for index in triangle)), None)
+
+        if polygon is None:
+            groups.append((list(triangle), [i]))
+        else:
+            polygon_triangles.setdefault(polygon, []).append(i)
+
+    return [(segment.polygons[polygon], triangles) for polygon, triangles in sorted(polygon_triangles.items())] + groups
+
+def _create_segment_part(segment: GeometrySegment, groups: List[Tuple[List[int], List[int]]]) -> GeometrySegment:
+    """ Creates a segment from some of the polygons of a segment, given as (polygon, indices of its
+        triangles) like _group_triangles_by_polygon returns, with only the vertices they use. """
+
+    triangle_indices = sorted(triangle for _, triangles in groups for triangle in triangles)
+
+    remap: Dict[int, int] = {}
+
+    for triangle in triangle_indices:
+        for index in segment.triangles[triangle]:
+            remap.setdefault(index, len(remap))
+
+    for polygon, _ in groups:
+        for index in polygon:
+            remap.setdefault(index, len(remap))
+
+    vertex_count = len(segment.positions)
+
+    def select(values):
+        if values is None or len(values) != vertex_count:
+            return values
+
+        return [values[index] for index in remap]
+
+    part = GeometrySegment()
+    part.material_name = segment.material_name
+    part.positions = select(segment.positions)
+    part.normals = select(segment.normals)
+    part.texcoords = select(segment.texcoords)
+    part.colors = select(segment.colors)
+    part.weights = select(segment.weights)
+    part.triangles = [[remap[index] for index in segment.triangles[triangle]] for triangle in triangle_indices]
+    part.polygons = [[remap[index] for index in polygon] for polygon, _ in groups]
+
+    return part
+
 def inject_dummy_data(model : Model):
     """  Adds a triangle and material to the model (scene root).  Needed to export zenasst-compatible skeletons. """
     model.hidden = True
@@ -45,6 +166,52 @@ def inject_dummy_data(model : Model):
     model.geometry = [dummy_seg]
     model.model_type = ModelType.STATIC
 
+def reorder_vertices_by_first_use(segment : GeometrySegment):
+    """ Renumbers a segment's vertices into the order they are first used by its
+        triangle strips, so the engine fetches vertices in order when drawing it.
+        Vertices never used by the strips keep their relative order after the rest. """
+
+    vertex_count = len(segment.positions)
+    remap: List[int] = [-1] * vertex_count
+    new_order: List[int] = []
+
+    def add_vertices(indices):
+        for index in indices:
+            if remap[index] == -1:
+                remap[index] = len(new_order)
+                new_order.append(index)
+
+    if segment.triangle_strips:
+        add_vertices(index for strip in segment.triangle_strips for index in strip)
+
+    add_vertices(index for triangle in segment.triangles for index in triangle)
+    add_vertices(range(vertex_count))
+
+    if new_order == list(range(vertex_count)):
+        return
+
+    def reorder(values):
+        if values is None or len(values) != vertex_count:
+            return values
+
+        return [values[index] for index in new_order]
+
+    segment.positions = reorder(segment.positions)
+    segment.normals = reorder(segment.normals)
+    segment.texcoords = reorder(segment.texcoords)
+    segment.colors = reorder(segment.colors)
+    segment.weights = reorder(segment.weights)
+
+    strips_are_triangles = segment.triangle_strips is segment.triangles
+
+    segment.triangles = [[remap[index] for index in triangle] for triangle in segment.triangles]
+    segment.polygons = [[remap[index] for index in polygon] for polygon in segment.polygons]
+
+    if strips_are_triangles:
+        segment.triangle_strips = segment.triangles
+    elif segment.triangle_strips is not None:
+        segment.triangle_strips = [[remap[index] for index in strip] for strip in segment.triangle_strips]
+
 def convert_vector_space(vec: Vector) -> Vector:
     return Vector((-vec.x, vec.z, vec.y))
 
@@ -54,30 +221,26 @@ def convert_scale_space(vec: Vector) -> Vector:
 def convert_rotation_space(quat: Quaternion) -> Quaternion:
     return Quaternion((-quat.w, quat.x, -quat.z, -quat.y))
 
-def model_transform_to_matrix(transform: ModelTransform):
-    return Matrix.Translation(convert_vector_space(transform.translation)) @ convert_rotation_space(transform.rotation).to_matrix().to_4x4()
-
 def scale_segments(scale: Vector, segments: List[GeometrySegment]):
     """ Scales are positions in the GeometrySegment list. """
 
     for segment in segments:
         segment.positions = [mul_vec(pos, scale) for pos in segment.positions]
 
-def get_model_world_matrix(model: Model, models: List[Model]) -> Matrix:
-    """ Gets a Blender Matrix for transforming the model into world space. """
+def get_model_world_transform(model: Model, models: List[Model]) -> ModelTransform:
+    """ Gets a ModelTransform for transforming the model into world space, by rotating
+        positions with its rotation and then adding its translation. """
+
+    world_transform = ModelTransform()
 
     transform_stack: List[ModelTransform] = [model.transform]
     transform_stack.extend((parent.transform for parent in get_model_ancestors(model, models)))
 
-    world_matrix: Matrix = Matrix()
-
-    for transform in reversed(transform_stack):
-        translation_matrix = Matrix.Translation(transform.translation)
-        rotation_matrix = transform.rotation.to_matrix().to_4x4()
-
-        world_matrix = world_matrix @ (translation_matrix @ rotation_matrix)
+    for transform in transform_stack:
+        world_transform.rotation = transform.rotation @ world_transform.rotation
+        world_transform.translation = add_vec(transform.rotation @ world_transform.translation, transform.translation)
 
-    return world_matrix
+    return world_transform
 
 def sort_by_parent(models: List[Model]) -> List[Model]:
     """ Sorts a Model list so that models are ordered by their parent.
@@ -0,0 +1,105 @@
+""" Process pool for running the pure Python parts of import/export in parallel. """
+
+import multiprocessing
+import os
+import traceback
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional, Sequence
+
+# Windows can't wait on more than 61 worker processes
+MAX_POOL_WORKERS = 61
+
+# Set once a pool has failed to run a task, e.g. because its workers can't import the add-on
+# (as when it is installed as a Blender extension), so the rest of the session doesn't pay
+# for starting pools that fail again.
+_pool_failed: bool = False
+
+
+def create_process_pool(num_tasks: int) -> Optional[ProcessPoolExecutor]:
+    """ Creates a process pool sized for num_tasks, or returns None if using one
+        isn't worthwhile or possible and the work should be done in this process. """
+
+    max_workers = min(num_tasks, os.cpu_count() or 1, MAX_POOL_WORKERS)
+
+    if max_workers < 2 or _pool_failed:
+        return None
+
+    try:
+        # Forking Blender isn't safe, workers are always started fresh.
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    except (OSError, ValueError, NotImplementedError):
+        return None
+
+
+def map_in_pool(fn: Callable, items: Sequence, work: Sequence[int] = None, min_work: int = 0) -> Iterator:
+    """ Yields fn(item) for each item, in order, as soon as each is available.
+
+        Items are run in a process pool if their total work (from work, which gives
+        an amount for each item, or else their count) is at least min_work and a pool
+        can be created, otherwise in this process. fn and the items must be picklable.
+
+        Exceptions raised by fn are raised from here. If the pool itself fails to run an item
+        (workers that can't start or import fn's module, an item that can't be pickled) that
+        item and the rest are run in this process instead, and no pool is used again. """
+
+    global _pool_failed
+
+    if work is None:
+        work = [1] * len(items)
+
+    pool = create_process_pool(len(items)) if sum(work) >= min_work else None
+
+    if pool is None:
+        for item in items:
+            yield fn(item)
+
+        return
+
+    try:
+        # Most work first so a big item isn't left running on its own at the end.
+        futures = [None] * len(items)
+
+        for i in sorted(range(len(items)), key=lambda i: work[i], reverse=True):
+            futures[i] = pool.submit(_run_task, fn, items[i])
+
+        for item, future in zip(items, futures):
+            if not _pool_failed:
+                try:
+                    result = future.result()
+                except Exception:
+                    # Anything fn raises comes back as a _TaskFailure, this is the pool failing.
+                    _pool_failed = True
+                else:
+                    if isinstance(result, _TaskFailure):
+                        raise result.exception from _RemoteTraceback(result.traceback)
+
+                    yield result
+                    continue
+
+            yield fn(item)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _TaskFailure:
+    """ An exception raised by fn in a worker, returned instead of raised so it can be
+        told apart from exceptions raised by the pool failing to run the task. """
+
+    def __init__(self, exception: Exception, traceback: str):
+        self.exception = exception
+        self.traceback = traceback
+
+
+class _RemoteTraceback(Exception):
+    """ Formatted traceback of an exception raised in a worker, chained to it as its cause. """
+
+    def __str__(self):
+        return self.args[0]
+
+
+def _run_task(fn: Callable, item):
+    try:
+        return fn(item)
+    except Exception as exception:
+        return _TaskFailure(exception, traceback.format_exc())
@@ -1,14 +1,12 @@
-""" Contains Scene object for representing a .msh file and the function to create one
-    from a Blender scene.  """
+""" Contains Scene object for representing a .msh file. """
 
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from copy import copy
 
-import bpy
-from mathutils import Vector
-
+from .msh_math import Vector
 from .msh_model import Model, Animation, ModelType
+from .msh_model_utilities import get_model_world_transform
 from .msh_material import *
 from .msh_utilities import *
 
@@ -20,8 +18,8 @@ class SceneAABB:
     AABB_INIT_MAX = -3.402823466e+38
     AABB_INIT_MIN = 3.402823466e+38
 
-    max_: Vector = Vector((AABB_INIT_MAX, AABB_INIT_MAX, AABB_INIT_MAX))
-    min_: Vector = Vector((AABB_INIT_MIN, AABB_INIT_MIN, AABB_INIT_MIN))
+    max_: Vector = field(default_factory=lambda: Vector((SceneAABB.AABB_INIT_MAX,) * 3))
+    min_: Vector = field(default_factory=lambda: Vector((SceneAABB.AABB_INIT_MIN,) * 3))
 
     def integrate_aabb(self, other):
         """ Merge another AABB with this AABB. """
@@ -44,4 +42,69 @@ class Scene:
 
     animation: Animation = None
 
-    skeleton: List[int] = field(default_factory=list)
\ No newline at end of file
+    skeleton: List[int] = field(default_factory=list)
+
+
+def create_scene_aabb(scene: Scene) -> SceneAABB:
+    """ Create a SceneAABB for a Scene. """
+
+    global_aabb = SceneAABB()
+
+    for model in scene.models:
+        if model.geometry is None or model.hidden:
+            continue
+
+        model_world_transform = get_model_world_transform(model, scene.models)
+        rotation = model_world_transform.rotation
+        translation = model_world_transform.translation
+
+        model_aabb = SceneAABB()
+
+        for segment in model.geometry:
+            segment_aabb = SceneAABB()
+
+            for pos in segment.positions:
+                segment_aabb.integrate_position(add_vec(rotation @ Vector(pos), translation))
+
+            model_aabb.integrate_aabb(segment_aabb)
+
+        global_aabb.integrate_aabb(model_aabb)
+
+    return global_aabb
+
+
+@dataclass
+class SegmentSummary:
+    """ Class summarizing a 'SEGM' section in a .msh file without its vertex data. """
+
+    material_name: str = ""
+    vertex_count: int = 0
+    triangle_count: int = 0
+
+@dataclass
+class ModelSummary:
+    """ Class summarizing a 'MODL' section in a .msh file without its vertex data. """
+
+    name: str = "Model"
+    parent: str = ""
+    model_type: ModelType = ModelType.NULL
+    hidden: bool = False
+
+    segments: List[SegmentSummary] = field(default_factory=list)
+
+@dataclass
+class SceneSummary:
+    """ Class summarizing the contents of a .msh file, see read_scene_summary. """
+
+    name: str = "Scene"
+    materials: Dict[str, Material] = field(default_factory=dict)
+    models: List[ModelSummary] = field(default_factory=list)
+
+    # From the 'BBOX' section in 'SINF'
+    bbox_center: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    bbox_extents: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    bbox_radius: float = 0.0
+
+    # From the 'FRAM' section in 'SINF', or 'CYCL' if the file has an animation
+    frame_range: Tuple[int, int] = (0, 0)
+    framerate: float = 29.97
@@ -1,26 +1,38 @@
 """ Contains functions for extracting a scene from a .msh file"""
 
+from dataclasses import dataclass, field, fields
+from functools import partial
 from itertools import islice
-from typing import Dict
-from .msh_scene import Scene
+from typing import Dict, List, Optional, Tuple, Iterator
+from .msh_scene import Scene, SceneSummary, ModelSummary, SegmentSummary
 from .msh_model import *
 from .msh_material import *
 from .msh_utilities import *
 
 from .crc import *
 
-from .chunked_file_reader import Reader
+from .chunked_file_reader import Reader, MappedFile
+from .chunked_file_index import ChunkEntry, index_chunks
+from .msh_process_pool import map_in_pool
 
 
 
-# Current model position
-model_counter = 0
+@dataclass
+class SceneReadContext:
+    """ State for reading a single scene.  Kept out of module globals so read_scene
+        is reentrant and can run in several threads or processes at once. """
 
-# Used to remap MNDX to the MODL's actual position
-mndx_remap : Dict[int, int]  = {}
+    # How much to print
+    debug_level: int = 0
 
-# How much to print
-debug_level = 0
+    # See read_scene
+    lazy: bool = False
+
+    # Current model position
+    model_counter: int = 0
+
+    # Used to remap MNDX to the MODL's actual position
+    mndx_remap: Dict[int, int] = field(default_factory=dict)
 
 
 '''
@@ -28,23 +40,24 @@ Debug levels just indicate how much info should be printed.
 0 = nothing
 1 = just blurbs about valuable info in the chunks
 2 = #1 + full chunk structure
+
+With lazy=True, geometry segments only record where their vertex and index chunks
+are and read them when first accessed (see LazyGeometrySegment), for callers that
+only need part of the data.  The returned LazyScene keeps the file mapped until it
+is closed.
 '''
-def read_scene(input_file, anim_only=False, debug=0) -> Scene:
+def read_scene(input_file, anim_only=False, debug=0, lazy=False) -> Scene:
 
-    global debug_level
-    debug_level = debug
+    context = SceneReadContext(debug_level=debug, lazy=lazy)
 
-    scene = Scene()
+    scene = LazyScene() if lazy else Scene()
     scene.models = []
     scene.materials = {}
 
-    global mndx_remap
-    mndx_remap = {}
-
-    global model_counter
-    model_counter = 0
+    with Reader(file=input_file, debug=context.debug_level>0, keep_mapped=lazy) as head:
 
-    with Reader(file=input_file, debug=debug_level>0) as head:
+        if lazy:
+            scene.mapped_file = head.mapped
 
         head.skip_until("HEDR")
 
@@ -77,10 +90,10 @@ def read_scene(input_file, anim_only=False, debug=0) -> Scene:
 
                                 elif next_header == "MODL":
                                     with msh2.read_child() as modl:
-                                        scene.models.append(_read_modl(modl, materials_list))
+                                        scene.models.append(_read_modl(modl, materials_list, context))
 
                                 else:
-                                    msh2.skip_bytes(1)
+                                    msh2.skip_chunk()
 
                 elif next_header == "SKL2":
                     with hedr.read_child() as skl2:
@@ -92,10 +105,10 @@ def read_scene(input_file, anim_only=False, debug=0) -> Scene:
                         scene.animation = _read_anm2(anm2)
 
                 else:
-                    hedr.skip_bytes(1)
+                    hedr.skip_chunk()
 
     # Print models in skeleton
-    if scene.skeleton and debug_level > 0:
+    if scene.skeleton and context.debug_level > 0:
         print("Skeleton models: ")
         for model in scene.models:
             for i in range(len(scene.skeleton)):                
@@ -114,17 +127,149 @@ def read_scene(input_file, anim_only=False, debug=0) -> Scene:
     for model in scene.models:
         if model.geometry:
             for seg in model.geometry:
-                if seg.weights:
-                    for weight_set in seg.weights:
-                        for vweight in weight_set:
-                            if vweight.bone in mndx_remap:
-                                vweight.bone = mndx_remap[vweight.bone]
-                            else:
-                                vweight.bone = 0
+                # Lazy segments remap their weights once they are read
+                if not isinstance(seg, LazyGeometrySegment) and seg.weights:
+                    _remap_mndx_weights(seg.weights, context.mndx_remap)
                     
     return scene
 
 
+def read_scene_file(filepath: str, anim_only=False, lazy=False) -> Scene:
+    """ Opens and reads the .msh file at filepath, see read_scene. """
+
+    with open(filepath, 'rb') as input_file:
+        return read_scene(input_file, anim_only, lazy=lazy)
+
+
+def read_scene_files(filepaths: List[str], anim_only=False) -> Iterator[Tuple[str, Scene]]:
+    """ Reads several .msh files in a process pool, yielding (filepath, scene) in the
+        order of filepaths as soon as each is available while the rest are still being read.
+
+        A single file is read in this process and lazily, so chunks that aren't used (like the
+        strips of segments that also have a triangle list) are never decoded. Its scene is
+        closed once the next item is requested, so it has to be used before that. """
+
+    if len(filepaths) == 1:
+        with read_scene_file(filepaths[0], anim_only, lazy=True) as scene:
+            yield filepaths[0], scene
+
+        return
+
+    scenes = map_in_pool(partial(read_scene_file, anim_only=anim_only), filepaths)
+
+    for filepath, scene in zip(filepaths, scenes):
+        yield filepath, scene
+
+
+def read_scene_summary(input_file) -> SceneSummary:
+    """ Reads the hierarchy, materials, per segment vertex/triangle counts, bounding box
+        and frame range of a .msh file without reading any vertex data. """
+
+    summary = SceneSummary()
+
+    with Reader(file=input_file) as head:
+
+        head.skip_until("HEDR")
+
+        index = index_chunks(head)
+
+        def read(entry: ChunkEntry, read_chunk):
+            with index.open(head, entry) as chunk:
+                return read_chunk(chunk)
+
+        msh2 = index.find("HEDR/MSH2")
+
+        if msh2 is not None:
+            for sinf in msh2.get_children("SINF"):
+                for name in sinf.get_children("NAME"):
+                    summary.name = read(name, Reader.read_string)
+
+                for fram in sinf.get_children("FRAM"):
+                    summary.frame_range, summary.framerate = read(fram, _read_fram)
+
+                for bbox in sinf.get_children("BBOX"):
+                    _, summary.bbox_center, summary.bbox_extents, summary.bbox_radius = read(bbox, _read_bbox)
+
+            materials_list = []
+
+            for matl in msh2.get_children("MATL"):
+                materials_list += read(matl, _read_matl_and_get_materials_list)
+
+            summary.materials = {material.name : material for material in materials_list}
+
+            for modl in msh2.get_children("MODL"):
+                summary.models.append(_read_modl_summary(modl, materials_list, read))
+
+        for cycl in index.find_all("CYCL"):
+            summary.frame_range, summary.framerate = read(cycl, _read_cycl_frame_range)
+
+    return summary
+
+
+def _read_modl_summary(modl: ChunkEntry, materials_list: List[Material], read) -> ModelSummary:
+
+    model = ModelSummary()
+
+    for mtyp in modl.get_children("MTYP"):
+        model.model_type = ModelType(read(mtyp, Reader.read_u32))
+
+    for name in modl.get_children("NAME"):
+        model.name = read(name, Reader.read_string)
+
+    for prnt in modl.get_children("PRNT"):
+        model.parent = read(prnt, Reader.read_string)
+
+    for flgs in modl.get_children("FLGS"):
+        model.hidden = bool(read(flgs, Reader.read_u32))
+
+    for geom in modl.get_children("GEOM"):
+        for segm in geom.get_children("SEGM"):
+            segment = SegmentSummary()
+
+            for mati in segm.get_children("MATI"):
+                material_index = read(mati, Reader.read_u32)
+
+                if material_index < len(materials_list):
+                    segment.material_name = materials_list[material_index].name
+
+            for posl in segm.get_children("POSL"):
+                segment.vertex_count = read(posl, Reader.read_u32)
+
+            ndxt = segm.get_children("NDXT")
+            strp = segm.get_children("STRP")
+
+            if ndxt:
+                segment.triangle_count = read(ndxt[0], Reader.read_u32)
+            elif strp:
+                segment.triangle_count = sum(len(strip) - 2 for strip in read(strp[0], _read_strp))
+
+            model.segments.append(segment)
+
+    return model
+
+
+def _read_fram(fram: Reader) -> Tuple[Tuple[int, int], float]:
+    first_frame, last_frame = fram.read_i32(2)
+    return (first_frame, last_frame), fram.read_f32()
+
+
+def _read_bbox(bbox: Reader):
+    """ Returns the rotation, center, extents and radius of a BBOX chunk. """
+
+    return bbox.read_f32(4), bbox.read_f32(3), bbox.read_f32(3), bbox.read_f32()
+
+
+def _read_cycl_frame_range(cycl: Reader) -> Tuple[Tuple[int, int], float]:
+    cycl.skip_bytes(4)  # Number of animations
+    cycl.skip_bytes(64) # Animation name
+
+    framerate = cycl.read_f32()
+    cycl.skip_bytes(4)  # Play style
+
+    first_frame, last_frame = cycl.read_u32(2)
+    return (first_frame, last_frame), framerate
+
+
 def _read_matl_and_get_materials_list(matl: Reader) -> List[Material]:
     materials_list: List[Material] = []
 
@@ -184,12 +329,12 @@ def _read_matd(matd: Reader) -> Material:
                     mat.texture3 = tx3d.read_string()
 
         else:
-            matd.skip_bytes(1)
+            matd.skip_chunk()
 
     return mat
 
 
-def _read_modl(modl: Reader, materials_list: List[Material]) -> Model:
+def _read_modl(modl: Reader, materials_list: List[Material], context: SceneReadContext) -> Model:
 
     model = Model()
 
@@ -205,13 +350,10 @@ def _read_modl(modl: Reader, materials_list: List[Material]) -> Model:
             with modl.read_child() as mndx:
                 index = mndx.read_u32()
 
-                global model_counter
-                global mndx_remap
-
-                if index not in mndx_remap:
-                    mndx_remap[index] = model_counter
+                if index not in context.mndx_remap:
+                    context.mndx_remap[index] = context.model_counter
 
-                model_counter += 1
+                context.model_counter += 1
 
         elif next_header == "NAME":
             with modl.read_child() as name:
@@ -240,25 +382,25 @@ def _read_modl(modl: Reader, materials_list: List[Material]) -> Model:
 
                     if next_header_geom == "SEGM":
                         with geom.read_child() as segm:
-                           model.geometry.append(_read_segm(segm, materials_list))
+                           model.geometry.append(_read_segm(segm, materials_list, context))
 
                     elif next_header_geom == "ENVL":
                         with geom.read_child() as envl:
                             num_indicies = envl.read_u32()
-                            envelope += [envl.read_u32() for _ in range(num_indicies)]
+                            envelope += envl.read_u32_array(num_indicies).tolist()
                     
                     elif next_header_geom == "CLTH":
                         with geom.read_child() as clth:
                             pass
                     
                     else:
-                        geom.skip_bytes(1)
+                        geom.skip_chunk()
 
             for seg in model.geometry:
-                if seg.weights and envelope:
-                    for weight_set in seg.weights:
-                        for vertex_weight in weight_set:
-                            vertex_weight.bone = envelope[vertex_weight.bone]
+                if isinstance(seg, LazyGeometrySegment):
+                    seg.envelope = envelope
+                elif seg.weights and envelope:
+                    _remap_envelope_weights(seg.weights, envelope)
 
         elif next_header == "SWCI":
             prim = CollisionPrimitive()
@@ -270,7 +412,7 @@ def _read_modl(modl: Reader, materials_list: List[Material]) -> Model:
             model.collisionprimitive = prim
 
         else:
-            modl.skip_bytes(1)
+            modl.skip_chunk()
 
     return model
 
@@ -287,9 +429,9 @@ def _read_tran(tran: Reader) -> ModelTransform:
     return xform
 
 
-def _read_segm(segm: Reader, materials_list: List[Material]) -> GeometrySegment:
+def _read_segm(segm: Reader, materials_list: List[Material], context: SceneReadContext) -> GeometrySegment:
 
-    geometry_seg = GeometrySegment()
+    geometry_seg = LazyGeometrySegment(segm=segm, remap=context.mndx_remap) if context.lazy else GeometrySegment()
 
     while segm.could_have_child():
 
@@ -299,116 +441,252 @@ def _read_segm(segm: Reader, materials_list: List[Material]) -> GeometrySegment:
             with segm.read_child() as mati:
                 geometry_seg.material_name = materials_list[mati.read_u32()].name
 
-        elif next_header == "POSL":
-            with segm.read_child() as posl:
-                num_positions = posl.read_u32()
+        elif next_header in SEGM_DATA_CHUNKS:
+            field_name, read_chunk = SEGM_DATA_CHUNKS[next_header]
 
-                for _ in range(num_positions):
-                    geometry_seg.positions.append(Vector(posl.read_f32(3)))
+            if context.lazy:
+                geometry_seg.defer(field_name, segm.get_current_pos())
+                segm.skip_chunk()
+            else:
+                with segm.read_child() as chunk:
+                    setattr(geometry_seg, field_name, read_chunk(chunk))
 
-        elif next_header == "NRML":
-            with segm.read_child() as nrml:
-                num_normals = nrml.read_u32()
-                
-                for _ in range(num_positions):
-                    geometry_seg.normals.append(Vector(nrml.read_f32(3))) 
+        else:
+            segm.skip_chunk()
 
-        elif next_header == "CLRL":
-            geometry_seg.colors = []
+    return geometry_seg
 
-            with segm.read_child() as clrl:
-                num_colors = clrl.read_u32()
 
-                for _ in range(num_colors):
-                    geometry_seg.colors += unpack_color(clrl.read_u32())
+def _read_posl(posl: Reader) -> List[Tuple[float, float, float]]:
+    num_positions = posl.read_u32()
+    return _group_components(posl.read_f32_array(num_positions * 3), 3)
 
-        elif next_header == "UV0L":
-            with segm.read_child() as uv0l:
-                num_texcoords = uv0l.read_u32()
 
-                for _ in range(num_texcoords):
-                    geometry_seg.texcoords.append(Vector(uv0l.read_f32(2))) 
+def _read_nrml(nrml: Reader) -> List[Tuple[float, float, float]]:
+    num_normals = nrml.read_u32()
+    return _group_components(nrml.read_f32_array(num_normals * 3), 3)
 
 
-        # TODO: Can't remember exact issue here, but this chunk sometimes fails
-        elif next_header == "NDXL":
+def _read_clrl(clrl: Reader) -> List[List[float]]:
+    num_colors = clrl.read_u32()
+    return [unpack_color(color) for color in clrl.read_u32_array(num_colors)]
 
-            with segm.read_child() as ndxl:
 
-                try:
-                    num_polygons = ndxl.read_u32()
+def _read_uv0l(uv0l: Reader) -> List[Tuple[float, float]]:
+    num_texcoords = uv0l.read_u32()
+    return _group_components(uv0l.read_f32_array(num_texcoords * 2), 2)
 
-                    for _ in range(num_polygons):
-                        num_inds = ndxl.read_u16()
-                        polygon = ndxl.read_u16(num_inds)
-                        geometry_seg.polygons.append(polygon)
-                except:
-                    print("Failed to read polygon list!")
-                    geometry_seg.polygons = []
-                
 
-        elif next_header == "NDXT":
-            with segm.read_child() as ndxt:
-                num_tris = ndxt.read_u32()
+# TODO: Can't remember exact issue here, but this chunk sometimes fails
+def _read_ndxl(ndxl: Reader) -> List[Tuple[int, ...]]:
+    polygons = []
 
-                for _ in range(num_tris):
-                    geometry_seg.triangles.append(ndxt.read_u16(3))
-        
-        # Try catch for safety's sake
-        elif next_header == "STRP":
-            strips : List[List[int]] = []
+    try:
+        num_polygons = ndxl.read_u32()
+        data = ndxl.read_u16_array(ndxl.bytes_remaining() // 2)
+        pos = 0
 
-            with segm.read_child() as strp:
+        for _ in range(num_polygons):
+            num_inds = data[pos]
+            polygons.append(tuple(data[pos + 1 : pos + 1 + num_inds]))
+            pos += 1 + num_inds
 
-                try: 
-                    num_indicies = strp.read_u32()
+        if pos > len(data):
+            raise IndexError("NDXL polygon list is truncated")
+    except:
+        print("Failed to read polygon list!")
+        polygons = []
 
-                    indices = strp.read_u16(num_indicies) 
+    return polygons
 
-                    strip_indices = []
 
-                    for i in range(num_indicies - 1):
-                        if indices[i] & 0x8000 > 0 and indices[i+1] & 0x8000 > 0:
-                            strip_indices.append(i)
+def _read_ndxt(ndxt: Reader) -> List[Tuple[int, int, int]]:
+    num_tris = ndxt.read_u32()
+    return _group_components(ndxt.read_u16_array(num_tris * 3), 3)
 
-                    strip_indices.append(num_indicies)
 
-                    for i in range(len(strip_indices) - 1):
-                        start = strip_indices[i]
-                        end = strip_indices[i+1]
+# Try catch for safety's sake
+def _read_strp(strp: Reader) -> List[List[int]]:
+    strips : List[List[int]] = []
 
-                        strips.append(list([indices[start] & 0x7fff, indices[start+1] & 0x7fff]) + list(indices[start+2 : end]))
-                except:
-                    print("Failed to read triangle strips")
-                    geometry_seg.triangle_strips = []
+    try: 
+        num_indicies = strp.read_u32()
 
-            geometry_seg.triangle_strips = strips
+        strips = decode_triangle_strips(strp.read_u16_array(num_indicies))
+    except:
+        print("Failed to read triangle strips")
 
-            # TODO: Dont know if/how to handle trailing 0 bug yet: https://schlechtwetterfront.github.io/ze_filetypes/msh.html#STRP
-            #if segm.read_u16 != 0: 
-            #    segm.skip_bytes(-2)
+    # TODO: Dont know if/how to handle trailing 0 bug yet: https://schlechtwetterfront.github.io/ze_filetypes/msh.html#STRP
+    #if segm.read_u16 != 0: 
+    #    segm.skip_bytes(-2)
 
-        elif next_header == "WGHT":
-            with segm.read_child() as wght:
-                
-                geometry_seg.weights = []
-                num_weights = wght.read_u32()
+    return strips
 
-                for _ in range(num_weights):
-                    weight_set = []
-                    for _ in range(4):
-                        index = wght.read_u32()
-                        value = wght.read_f32()
 
-                        if value > 0.000001:
-                            weight_set.append(VertexWeight(value,index))
+def _read_wght(wght: Reader) -> List[List[VertexWeight]]:
+    weights = []
+    num_weights = wght.read_u32()
 
-                    geometry_seg.weights.append(weight_set)
+    # Each vertex has 4 (u32 index, f32 value) pairs
+    data_pos = wght.get_current_pos()
+    indices = wght.read_u32_array(num_weights * 8)[0::2]
+    wght.set_current_pos(data_pos)
+    values = wght.read_f32_array(num_weights * 8)[1::2]
 
-        else:
-            segm.skip_bytes(1)
+    for i in range(0, num_weights * 4, 4):
+        weights.append([VertexWeight(values[j], indices[j]) for j in range(i, i + 4) if values[j] > 0.000001])
 
-    return geometry_seg
+    return weights
+
+
+# Maps the SEGM chunks holding vertex/index data to the GeometrySegment field
+# they are read into and the function that reads them.
+SEGM_DATA_CHUNKS = {
+    "POSL" : ("positions", _read_posl),
+    "NRML" : ("normals", _read_nrml),
+    "CLRL" : ("colors", _read_clrl),
+    "UV0L" : ("texcoords", _read_uv0l),
+    "NDXL" : ("polygons", _read_ndxl),
+    "NDXT" : ("triangles", _read_ndxt),
+    "STRP" : ("triangle_strips", _read_strp),
+    "WGHT" : ("weights", _read_wght),
+}
+
+
+def _remap_envelope_weights(weights: List[List[VertexWeight]], envelope: List[int]):
+    """ Changes weight indices into the segment's ENVL to MNDX indices. """
+
+    for weight_set in weights:
+        for vertex_weight in weight_set:
+            vertex_weight.bone = envelope[vertex_weight.bone]
+
+
+def _remap_mndx_weights(weights: List[List[VertexWeight]], remap: Dict[int, int]):
+    """ Changes weight indices from a MODL's MNDX to the MODL's position in the file. """
+
+    for weight_set in weights:
+        for vweight in weight_set:
+            if vweight.bone in remap:
+                vweight.bone = remap[vweight.bone]
+            else:
+                vweight.bone = 0
+
+
+class _DeferredField:
+    """ Descriptor for a LazyGeometrySegment field that is read from its chunk on first access. """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, segment, owner=None):
+        if segment is None:
+            return self
+
+        if self.name in segment.pending_chunks:
+            segment.__dict__[self.name] = segment.read_deferred(self.name)
+
+        return segment.__dict__[self.name]
+
+    def __set__(self, segment, value):
+        # The dataclass __init__ sets the GeometrySegment fields before pending_chunks exists.
+        pending_chunks = segment.__dict__.get("pending_chunks")
+
+        if pending_chunks:
+            pending_chunks.pop(self.name, None)
+
+        segment.__dict__[self.name] = value
+
+
+@dataclass
+class LazyGeometrySegment(GeometrySegment):
+    """ GeometrySegment that only records where its vertex and index chunks are
+        and reads each of them the first time the matching field is accessed.
+
+        Deferred chunks are read from segm, so they can only be read until the
+        LazyScene the segment belongs to is closed. Copies keep their own record
+        of the chunks still to be read, pickled segments are read in full. """
+
+    positions = _DeferredField()
+    normals = _DeferredField()
+    colors = _DeferredField()
+    texcoords = _DeferredField()
+    weights = _DeferredField()
+    polygons = _DeferredField()
+    triangles = _DeferredField()
+    triangle_strips = _DeferredField()
+
+    segm: Optional[Reader] = field(default=None, repr=False, compare=False)
+    remap: Dict[int, int] = field(default_factory=dict, repr=False, compare=False)
+    envelope: List[int] = field(default_factory=list, repr=False, compare=False)
+
+    # Field name -> position of the chunk it is read from.
+    pending_chunks: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __copy__(self):
+        segment = LazyGeometrySegment.__new__(LazyGeometrySegment)
+        segment.__dict__.update(self.__dict__)
+        segment.pending_chunks = dict(self.pending_chunks)
+
+        return segment
+
+    def __reduce__(self):
+        # The mapped file can't be pickled, so this reads everything still deferred.
+        return (GeometrySegment, tuple(getattr(self, segment_field.name) for segment_field in fields(GeometrySegment)))
+
+    def defer(self, field_name: str, chunk_pos: int):
+        """ Records the position of the chunk to read field_name from. """
+
+        self.pending_chunks[field_name] = chunk_pos
+
+    def read_deferred(self, field_name: str):
+        """ Reads field_name from its chunk, with weights remapped like read_scene does. """
+
+        chunk_pos = self.pending_chunks.pop(field_name)
+        header = next(header for header, (name, _) in SEGM_DATA_CHUNKS.items() if name == field_name)
+
+        self.segm.set_current_pos(chunk_pos)
+
+        with self.segm.read_child() as chunk:
+            value = SEGM_DATA_CHUNKS[header][1](chunk)
+
+        if field_name == "weights":
+            if self.envelope:
+                _remap_envelope_weights(value, self.envelope)
+
+            _remap_mndx_weights(value, self.remap)
+
+        if not self.pending_chunks:
+            # Nothing left to read, let go of the file.
+            self.segm = None
+
+        return value
+
+
+@dataclass
+class LazyScene(Scene):
+    """ Scene read by read_scene with lazy=True. Keeps the file it was read from mapped
+        for its LazyGeometrySegments until close is called or its with block is left. """
+
+    mapped_file: Optional[MappedFile] = field(default=None, repr=False, compare=False)
+
+    def close(self):
+        """ Releases the file. Segment fields that haven't been read can't be read after this. """
+
+        if self.mapped_file is not None:
+            self.mapped_file.close()
+            self.mapped_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _group_components(values, num_components: int) -> List[Tuple]:
+    """ Groups a flat array of vertex data into a list of tuples of num_components values. """
+
+    return list(zip(*[iter(values)] * num_components))
 
 
 
@@ -464,7 +742,7 @@ def _read_anm2(anm2: Reader) -> Animation:
                     anim.bone_frames[bone_crc] = frames
 
         else:
-            anm2.skip_bytes(1)
+            anm2.skip_chunk()
 
     return anim
 
@@ -1,21 +1,38 @@
 """ Contains functions for saving a Scene to a .msh file.  """
 
+import io
+import struct
+
+from functools import partial
 from itertools import islice
-from typing import Dict
-from .msh_scene import Scene
-from .msh_scene_utilities import create_scene_aabb
+from typing import Dict, Optional, Tuple
+from .msh_scene import Scene, create_scene_aabb
 from .msh_model import *
 from .msh_material import *
 from .msh_writer import Writer
 from .msh_utilities import *
+from .msh_process_pool import map_in_pool
+from .msh_export_cache import ExportCache
 
 from .crc import *
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Fewer vertices than this in a scene are written faster than a process pool can be started.
+PARALLEL_MIN_VERTICES: int = 200000
 
-def save_scene(output_file, scene: Scene):
-    """ Saves scene to the supplied file. """
+def save_scene(output_file, scene: Scene, export_cache: ExportCache = None):
+    """ Saves scene to the supplied file.
 
-    with Writer(file=output_file, chunk_id="HEDR") as hedr:
+        When the scene has enough geometry to be worth it the 'SEGM' chunks
+        are serialized in a process pool. If export_cache is not None the 'SEGM'
+        chunks of models it has keys for are reused from and saved to it. """
+
+    with Writer(file=output_file, chunk_id="HEDR", buffered=True) as hedr:
         with hedr.create_child("MSH2") as msh2:
 
             with msh2.create_child("SINF") as sinf:
@@ -27,9 +44,11 @@ def save_scene(output_file, scene: Scene):
             with msh2.create_child("MATL") as matl:
                 material_index = _write_matl_and_get_material_index(matl, scene)
 
+            segm_chunks = _serialize_segms(scene, material_index, export_cache)
+
             for index, model in enumerate(scene.models):
                 with msh2.create_child("MODL") as modl:
-                    _write_modl(modl, model, index, material_index, model_index)
+                    _write_modl(modl, model, index, material_index, model_index, segm_chunks[index])
 
         # Contrary to earlier belief, anim/skel info does not need to be exported for animated models
         # BUT, unless a model is a BONE, it wont animate!
@@ -119,7 +138,91 @@ def _write_matd(matd: Writer, material_name: str, material: Material):
             with matd.create_child("TX3D") as tx3d:
                 tx3d.write_string(material.texture3)
 
-def _write_modl(modl: Writer, model: Model, index: int, material_index: Dict[str, int], model_index: Dict[str, int]):
+def _serialize_segms(scene: Scene, material_index: Dict[str, int],
+                     export_cache: ExportCache = None) -> List[Optional[List[bytes]]]:
+    """ Serializes the 'SEGM' chunks of the models' segments ahead of writing the models, returning
+        the chunks of each model or None for models whose segments should be written directly.
+
+        Chunks are reused from export_cache when it has them for a model and stored in it otherwise.
+        When there are enough vertices left to serialize to be worth it they are serialized in a process pool. """
+
+    segm_chunks: List[Optional[List[bytes]]] = [None] * len(scene.models)
+    cache_keys: List[Optional[str]] = [None] * len(scene.models)
+    material_indices: List[Tuple[int, ...]] = [()] * len(scene.models)
+
+    if export_cache is not None:
+        for i, model in enumerate(scene.models):
+            if model.geometry is None or model.name not in export_cache.model_keys:
+                continue
+
+            cache_keys[i] = export_cache.model_keys[model.name]
+            material_indices[i] = tuple(material_index.get(segment.material_name, 0) for segment in model.geometry)
+
+            chunks = export_cache.get_segm_chunks(cache_keys[i], material_indices[i])
+
+            if chunks is not None and len(chunks) == len(model.geometry):
+                segm_chunks[i] = chunks
+
+    pending = [i for i, model in enumerate(scene.models) if model.geometry is not None and segm_chunks[i] is None]
+    pool_chunks = _serialize_segms_in_pool([scene.models[i] for i in pending], material_index)
+
+    if pool_chunks is not None:
+        for i, chunks in zip(pending, pool_chunks):
+            segm_chunks[i] = chunks
+
+    for i, cache_key in enumerate(cache_keys):
+        if cache_key is None:
+            continue
+
+        if segm_chunks[i] is None:
+            segm_chunks[i] = [_serialize_segm(segment, material_index) for segment in scene.models[i].geometry]
+
+        export_cache.store_segm_chunks(cache_key, material_indices[i], segm_chunks[i])
+
+    return segm_chunks
+
+def _serialize_segms_in_pool(models: List[Model], material_index: Dict[str, int]) -> Optional[List[List[bytes]]]:
+    """ Serializes the 'SEGM' chunks of each model's segments in a process pool.
+        Returns None if the models are too small to be worth it. """
+
+    segments = [segment for model in models for segment in model.geometry]
+
+    if sum(len(segment.positions) for segment in segments) < PARALLEL_MIN_VERTICES:
+        return None
+
+    chunks = map_in_pool(partial(_serialize_segm, material_index=material_index),
+                         [_get_picklable_segment(segment) for segment in segments],
+                         [len(segment.positions) for segment in segments])
+
+    return [[next(chunks) for _ in model.geometry] for model in models]
+
+def _serialize_segm(segment: GeometrySegment, material_index: Dict[str, int]) -> bytes:
+    """ Serializes a complete 'SEGM' chunk, for Writer.write_chunk. """
+
+    output = io.BytesIO()
+
+    with Writer(file=output, chunk_id="SEGM", buffered=True) as segm:
+        _write_segm(segm, segment, material_index)
+
+    return output.getvalue()
+
+def _get_picklable_segment(segment: GeometrySegment) -> GeometrySegment:
+    """ Returns a copy of a segment holding only plain Python types, as
+        mathutils vectors and lazily read segments can't be sent to another process. """
+
+    return GeometrySegment(
+        material_name=segment.material_name,
+        positions=[tuple(position) for position in segment.positions],
+        normals=[tuple(normal) for normal in segment.normals],
+        colors=[list(color) for color in segment.colors] if segment.colors is not None else None,
+        texcoords=[tuple(texcoord) for texcoord in segment.texcoords] if segment.texcoords is not None else None,
+        weights=segment.weights,
+        polygons=segment.polygons,
+        triangles=segment.triangles,
+        triangle_strips=segment.triangle_strips)
+
+def _write_modl(modl: Writer, model: Model, index: int, material_index: Dict[str, int], model_index: Dict[str, int],
+                segm_chunks: List[bytes] = None):
     with modl.create_child("MTYP") as mtyp:
         mtyp.write_u32(model.model_type.value)
 
@@ -148,9 +251,13 @@ def _write_modl(modl: Writer, model: Model, index: int, material_index: Dict[str
                 bbox.write_f32(0, 0, 0)
                 bbox.write_f32(1.0,1.0,1.0,2.0)
 
-            for segment in model.geometry:
-                with geom.create_child("SEGM") as segm:
-                    _write_segm(segm, segment, material_index)
+            if segm_chunks is not None:
+                for segm_chunk in segm_chunks:
+                    geom.write_chunk(segm_chunk)
+            else:
+                for segment in model.geometry:
+                    with geom.create_child("SEGM") as segm:
+                        _write_segm(segm, segment, material_index)
 
             if model.bone_map:
                 with geom.create_child("ENVL") as envl:
@@ -175,9 +282,7 @@ def _write_segm(segm: Writer, segment: GeometrySegment, material_index: Dict[str
 
     with segm.create_child("POSL") as posl:
         posl.write_u32(len(segment.positions))
-
-        for position in segment.positions:
-            posl.write_f32(position.x, position.y, position.z)
+        posl.write_f32_array(_flatten_components(segment.positions))
 
     if segment.weights:
         with segm.create_child("WGHT") as wght:
@@ -185,64 +290,65 @@ def _write_segm(segm: Writer, segment: GeometrySegment, material_index: Dict[str
 
     with segm.create_child("NRML") as nrml:
         nrml.write_u32(len(segment.normals))
-
-        for i,normal in enumerate(segment.normals):
-            nrml.write_f32(normal.x, normal.y, normal.z)
+        nrml.write_f32_array(_flatten_components(segment.normals))
 
     if segment.colors is not None:
         with segm.create_child("CLRL") as clrl:
             clrl.write_u32(len(segment.colors))
-
-            for color in segment.colors:
-                clrl.write_u32(pack_color(color))
+            clrl.write_u32_array([pack_color(color) for color in segment.colors])
 
     if segment.texcoords is not None:
         with segm.create_child("UV0L") as uv0l:
             uv0l.write_u32(len(segment.texcoords))
-
-            for texcoord in segment.texcoords:
-                uv0l.write_f32(texcoord.x, texcoord.y)
+            uv0l.write_f32_array(_flatten_components(segment.texcoords))
 
     with segm.create_child("NDXL") as ndxl:
         ndxl.write_u32(len(segment.polygons))
-
-        for polygon in segment.polygons:
-            ndxl.write_u16(len(polygon))
-
-            for index in polygon:
-                ndxl.write_u16(index)
+        ndxl.write_u16_array([value for polygon in segment.polygons for value in (len(polygon), *polygon)])
 
     with segm.create_child("NDXT") as ndxt:
         ndxt.write_u32(len(segment.triangles))
-
-        for triangle in segment.triangles:
-            ndxt.write_u16(triangle[0], triangle[1], triangle[2])
+        ndxt.write_u16_array([index for triangle in segment.triangles for index in islice(triangle, 3)])
 
     with segm.create_child("STRP") as strp:
         strp.write_u32(sum(len(strip) for strip in segment.triangle_strips))
+        strp.write_u16_array(encode_triangle_strips(segment.triangle_strips))
 
-        for strip in segment.triangle_strips:
-            strp.write_u16(strip[0] | 0x8000, strip[1] | 0x8000)
+def _flatten_components(vectors):
+    """ Returns vectors as one flat sequence of components, for bulk writing.
+        NumPy arrays of any shape and float type become flat float32 arrays,
+        other buffers (array.array) are returned as they are. """
 
-            for index in islice(strip, 2, len(strip)):
-                strp.write_u16(index)
+    if isinstance(vectors, (list, tuple)):
+        return [component for vector in vectors for component in vector]
+
+    if numpy is not None and isinstance(vectors, numpy.ndarray):
+        return numpy.ascontiguousarray(vectors, dtype=numpy.float32).reshape(-1)
+
+    return vectors
 
 '''
 SKINNING CHUNKS
 '''
+# Four (bone index, weight) pairs per vertex
+WGHT_VERTEX_STRUCT = struct.Struct("<ifififif")
+
 def _write_wght(wght: Writer, weights: List[List[VertexWeight]]):
     wght.write_u32(len(weights))
 
+    packed_weights = []
+
     for weight_list in weights:
-        weight_list += [VertexWeight(0.0, 0)] * 4
+        weight_list = weight_list + [VertexWeight(0.0, 0)] * 4
         weight_list = sorted(weight_list, key=lambda w: w.weight, reverse=True)
         weight_list = weight_list[:4]
 
         total_weight = max(sum(map(lambda w: w.weight, weight_list)), 1e-5)
 
-        for weight in weight_list:
-            wght.write_i32(weight.bone)
-            wght.write_f32(weight.weight / total_weight)
+        packed_weights.append(WGHT_VERTEX_STRUCT.pack(*(value for weight in weight_list
+                                                        for value in (weight.bone, weight.weight / total_weight))))
+
+    wght.write_bytes(b"".join(packed_weights))
 
 def _write_envl(envl: Writer, model: Model, model_index: Dict[str, int]):
     envl.write_u32(len(model.bone_map))
@@ -2,6 +2,7 @@
     Model objects. """
 
 import bpy
+from mathutils import Matrix
 import bmesh
 import math
 
@@ -7,10 +7,14 @@ from copy import copy
 import bpy
 from mathutils import Vector
 from .msh_model import Model, Animation, ModelType
-from .msh_scene import Scene, SceneAABB
-from .msh_model_gather import gather_models
-from .msh_model_utilities import make_null, validate_geometry_segment, sort_by_parent, has_multiple_root_models, reparent_model_roots, get_model_world_matrix, inject_dummy_data
-from .msh_model_triangle_strips import create_models_triangle_strips
+from .msh_scene import Scene, SceneAABB, create_scene_aabb
+from .msh_model_gather import gather_models, VertexWeldTolerances
+from .msh_model_utilities import make_null, validate_geometry_segment, sort_by_parent, has_multiple_root_models, reparent_model_roots, inject_dummy_data, reorder_vertices_by_first_use
+from .msh_model_triangle_strips import create_models_triangle_strips, DEFAULT_VERTEX_CACHE_SIZE
+from .msh_model_triangle_order import reorder_models_triangles_for_overdraw
+from .msh_strip_statistics import SegmentStripStatistics
+from .msh_strip_cache import TriangleStripCache
+from .msh_export_cache import ExportCache
 from .msh_material import *
 from .msh_material_gather import gather_materials
 from .msh_material_utilities import remove_unused_materials
@@ -33,8 +37,26 @@ def set_scene_animation(scene : Scene, armature_obj : bpy.types.Object):
 
 
 
-def create_scene(generate_triangle_strips: bool, apply_modifiers: bool, export_target: str, skel_only: bool) -> Tuple[Scene, bpy.types.Object]:
-    """ Create a msh Scene from the active Blender scene. """
+def create_scene(generate_triangle_strips: bool, apply_modifiers: bool, export_target: str, skel_only: bool,
+                 optimize_triangle_strips: bool = False, vertex_cache_size: int = DEFAULT_VERTEX_CACHE_SIZE,
+                 strip_statistics: List[SegmentStripStatistics] = None,
+                 strip_cache: TriangleStripCache = None,
+                 reduce_overdraw: bool = False,
+                 weld_tolerances: VertexWeldTolerances = None,
+                 export_cache: ExportCache = None) -> Tuple[Scene, bpy.types.Object]:
+    """ Create a msh Scene from the active Blender scene.
+
+        If weld_tolerances is not None vertices with attributes within them are welded together.
+
+        If reduce_overdraw is True the triangles of static models are reordered to reduce overdraw
+        before triangle strips are generated.
+
+        If strip_statistics is not None, statistics for each segment's triangle strips are appended to it.
+        If strip_cache is not None triangle strips are reused from and saved to it.
+
+        If export_cache is not None the processed geometry of models whose meshes haven't changed
+        since it was stored is taken from it, and only the rest are processed and saved to it.
+        strip_statistics then only covers the segments that were processed. """
 
     scene = Scene()
 
@@ -42,13 +64,42 @@ def create_scene(generate_triangle_strips: bool, apply_modifiers: bool, export_t
 
     scene.materials = gather_materials()
 
-    scene.models, armature_obj = gather_models(apply_modifiers=apply_modifiers, export_target=export_target, skeleton_only=skel_only)
+    if export_cache is not None:
+        export_cache.begin_export(f"{generate_triangle_strips}:{optimize_triangle_strips}:"
+                                  f"{vertex_cache_size}:{reduce_overdraw}")
+
+    scene.models, armature_obj = gather_models(apply_modifiers=apply_modifiers, export_target=export_target, skeleton_only=skel_only,
+                                                 weld_tolerances=weld_tolerances, export_cache=export_cache)
     scene.models = sort_by_parent(scene.models)
 
+    # Models whose geometry came from export_cache have already been through everything below.
+    models_to_process = [model for model in scene.models
+                         if export_cache is None or model.name not in export_cache.processed_models]
+
+    # Models sharing geometry only need it processed once, the rest take a copy of the result.
+    processed_shared_models: Dict[Tuple, Model] = {}
+    sharing_models: List[Model] = []
+    unshared_models: List[Model] = []
+
+    for model in models_to_process:
+        if model.shared_geometry_key in processed_shared_models:
+            sharing_models.append(model)
+        else:
+            if model.shared_geometry_key is not None:
+                processed_shared_models[model.shared_geometry_key] = model
+
+            unshared_models.append(model)
+
+    models_to_process = unshared_models
+
+    if reduce_overdraw:
+        reorder_models_triangles_for_overdraw(models_to_process, vertex_cache_size)
+
     if generate_triangle_strips:
-        scene.models = create_models_triangle_strips(scene.models)
+        create_models_triangle_strips(models_to_process, optimize_triangle_strips, vertex_cache_size,
+                                      strip_statistics, strip_cache)
     else:
-        for model in scene.models:
+        for model in models_to_process:
             if model.geometry:
                 for segment in model.geometry:
                     segment.triangle_strips = segment.triangles
@@ -59,14 +110,29 @@ def create_scene(generate_triangle_strips: bool, apply_modifiers: bool, export_t
     # We could also make models with no valid segments nulls, since they might as well be, 
     # but that could have unforseeable consequences further down the modding pipeline
     # and is not necessary to avoid the aforementioned crashes...
-    for model in scene.models:
+    for model in models_to_process:
         if model.geometry is not None:
             # Doing this in msh_model_gather would be messy and the presence/absence
             # of triangle strips is required for a validity check.
             model.geometry = [segment for segment in model.geometry if validate_geometry_segment(segment)]
+
+            # Has no effect on the file size or format, but lets the engine read
+            # vertices in order as it walks the triangle strips.
+            for segment in model.geometry:
+                reorder_vertices_by_first_use(segment)
             #if not model.geometry:
             #    make_null(model)
 
+    for model in sharing_models:
+        model.geometry = [copy(segment) for segment in processed_shared_models[model.shared_geometry_key].geometry]
+
+    models_to_process += sharing_models
+
+    if export_cache is not None:
+        for model in models_to_process:
+            if model.geometry is not None and model.name in export_cache.model_keys:
+                export_cache.store_geometry(model.name, export_cache.model_keys[model.name], model.geometry)
+
     if has_multiple_root_models(scene.models):
         scene.models = reparent_model_roots(scene.models)
 
@@ -80,28 +146,3 @@ def create_scene(generate_triangle_strips: bool, apply_modifiers: bool, export_t
         inject_dummy_data(root)
 
     return scene, armature_obj
-
-
-def create_scene_aabb(scene: Scene) -> SceneAABB:
-    """ Create a SceneAABB for a Scene. """
-
-    global_aabb = SceneAABB()
-
-    for model in scene.models:
-        if model.geometry is None or model.hidden:
-            continue
-
-        model_world_matrix = get_model_world_matrix(model, scene.models)
-        model_aabb = SceneAABB()
-
-        for segment in model.geometry:
-            segment_aabb = SceneAABB()
-
-            for pos in segment.positions:
-                segment_aabb.integrate_position(model_world_matrix @ pos)
-
-            model_aabb.integrate_aabb(segment_aabb)
-
-        global_aabb.integrate_aabb(model_aabb)
-
-    return global_aabb
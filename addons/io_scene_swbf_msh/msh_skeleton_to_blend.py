@@ -3,6 +3,7 @@ mean models that will end up in an armature.  Literal SWBF skeletons (zafbins)
 are not relevant as of now. """
 
 import bpy
+from mathutils import Matrix
 import math
 
 from typing import List, Set, Dict, Tuple
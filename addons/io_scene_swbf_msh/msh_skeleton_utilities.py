@@ -1,6 +1,7 @@
 """ Armature -> SWBF skeleton mapping functions """
 
 import bpy
+from mathutils import Matrix
 import math
 
 from typing import List, Set, Dict, Tuple
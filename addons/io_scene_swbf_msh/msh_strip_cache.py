@@ -0,0 +1,213 @@
+""" On-disk cache of generated triangle strips, so unchanged segments don't need
+    to be stripped again when re-exported, even across Blender sessions. """
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from array import array
+from typing import List, Optional
+
+from .msh_utilities import encode_triangle_strips, decode_triangle_strips
+
+# Bump when strip generation changes, so strips made by older versions aren't reused.
+# Entries are kept in a directory per version and those of other versions are removed by prune.
+STRIP_CACHE_VERSION: int = 2
+
+# prune removes the least recently used entries beyond this many bytes.
+STRIP_CACHE_MAX_BYTES: int = 128 * 1024 * 1024
+
+# Temporary files older than this are left from interrupted exports and removed by prune.
+STRIP_CACHE_TEMP_FILE_MAX_AGE: float = 60.0 * 60.0
+
+# Names of the directories the cache creates. Version 1 kept entries in "<2 hex digits>"
+# directories directly in the cache directory, later versions in "v<version>" directories.
+_ENTRY_DIR_NAME = re.compile(r"[0-9a-f]{2}")
+_VERSION_DIR_NAME = re.compile(r"v[0-9]+")
+_ENTRY_FILE_NAME = re.compile(r"[0-9a-f]{40}(\.[0-9]+\.tmp)?")
+
+
+def get_default_strip_cache_dir() -> str:
+    """ Returns the per-user directory used for the strip cache by default. """
+
+    if sys.platform == "win32":
+        base_dir = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+    else:
+        base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(base_dir, "swbf_msh_io", "triangle_strips")
+
+
+class TriangleStripCache:
+    """ Stores triangle strips in a directory, one file per segment, keyed by a hash of the
+        segment's triangles and how the strips were generated.
+
+        Strips are stored like the 'STRP' section of a .msh file. Any problem reading or
+        writing the cache is treated as a miss, the cache is never required for an export.
+
+        Nothing is removed from the cache until prune is called. """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def get_key(self, triangles: List[List[int]], strip_mode: str, triangle_clusters: List[int] = None) -> str:
+        """ Returns the key for strips generated from triangles, within triangle_clusters if it isn't None.
+            strip_mode must identify the way the strips are generated, including any settings used. """
+
+        digest = hashlib.sha1()
+        digest.update(f"{STRIP_CACHE_VERSION}:{strip_mode}:{len(triangles)}:".encode("ascii"))
+        digest.update(array("I", (index for triangle in triangles for index in triangle)).tobytes())
+
+        if triangle_clusters is not None:
+            digest.update(f":clusters:{len(triangle_clusters)}:".encode("ascii"))
+            digest.update(array("I", triangle_clusters).tobytes())
+
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[List[List[int]]]:
+        """ Returns the strips stored for key or None if there are none. """
+
+        path = self._get_path(key)
+
+        try:
+            with open(path, "rb") as cache_file:
+                indices = array("H")
+                indices.frombytes(cache_file.read())
+
+            # Marks the entry as recently used for prune.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        if sys.byteorder != "little":
+            indices.byteswap()
+
+        strips = decode_triangle_strips(indices)
+
+        # An empty or damaged entry, strip generation never makes strips this short.
+        if not strips or any(len(strip) < 3 for strip in strips):
+            return None
+
+        return strips
+
+    def store(self, key: str, strips: List[List[int]]):
+        """ Stores strips for key. Strips with indices that can't be
+            encoded as in a .msh file are not stored. """
+
+        if not strips or any(index > 0x7fff for strip in strips for index in strip):
+            return
+
+        indices = array("H", encode_triangle_strips(strips))
+
+        if sys.byteorder != "little":
+            indices.byteswap()
+
+        path = self._get_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(indices.tobytes())
+
+            # Replace in one step so other exports never read a partially written entry.
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def prune(self, max_bytes: int = STRIP_CACHE_MAX_BYTES):
+        """ Removes the entries of other versions of the cache and temporary files left by
+            interrupted exports, then the least recently used entries until the cache takes
+            up no more than max_bytes. Only files and directories named like the ones the
+            cache creates are removed. """
+
+        version_dir = self._get_version_dir()
+        now = time.time()
+
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            path = os.path.join(self.directory, name)
+
+            if path == version_dir or not os.path.isdir(path):
+                continue
+
+            if _VERSION_DIR_NAME.fullmatch(name):
+                shutil.rmtree(path, ignore_errors=True)
+            elif _ENTRY_DIR_NAME.fullmatch(name):
+                _remove_entry_dir(path)
+
+        entries = []
+
+        try:
+            entry_dirs = [entry for entry in os.scandir(version_dir) if entry.is_dir()]
+        except OSError:
+            return
+
+        for entry_dir in entry_dirs:
+            try:
+                for entry in os.scandir(entry_dir.path):
+                    if not entry.is_file() or not _ENTRY_FILE_NAME.fullmatch(entry.name):
+                        continue
+
+                    stat = entry.stat()
+
+                    if entry.name.endswith(".tmp"):
+                        if now - stat.st_mtime > STRIP_CACHE_TEMP_FILE_MAX_AGE:
+                            _remove_file(entry.path)
+                    else:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                continue
+
+        total_bytes = sum(size for _, size, _ in entries)
+
+        if total_bytes <= max_bytes:
+            return
+
+        entries.sort()
+
+        for _, size, path in entries:
+            if total_bytes <= max_bytes:
+                break
+
+            if _remove_file(path):
+                total_bytes -= size
+
+    def _get_version_dir(self) -> str:
+        return os.path.join(self.directory, f"v{STRIP_CACHE_VERSION}")
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._get_version_dir(), key[:2], key)
+
+
+def _remove_file(path: str) -> bool:
+    try:
+        os.remove(path)
+    except OSError:
+        return False
+
+    return True
+
+def _remove_entry_dir(directory: str):
+    """ Removes the files named like cache entries in directory, then the directory itself if that left it empty. """
+
+    try:
+        for entry in os.scandir(directory):
+            if entry.is_file() and _ENTRY_FILE_NAME.fullmatch(entry.name):
+                _remove_file(entry.path)
+
+        os.rmdir(directory)
+    except OSError:
+        pass
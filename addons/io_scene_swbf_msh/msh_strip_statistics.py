@@ -0,0 +1,157 @@
+""" Statistics for comparing a segment's triangle strips against its triangle list. """
+
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Iterable
+from collections import deque
+
+# Post-transform vertex cache sizes to report simulated cache miss ratios for.
+REPORT_VERTEX_CACHE_SIZES: Tuple[int, ...] = (8, 16, 24, 32)
+
+# Cost of an index relative to a vertex cache miss, which has to fetch and transform
+# a whole vertex where an index is two bytes read in order.
+INDEX_COST: float = 0.125
+
+@dataclass
+class SegmentStripStatistics:
+    """ Class describing how well the triangle strips of a GeometrySegment turned out. """
+
+    model_name: str = ""
+    material_name: str = ""
+
+    triangle_count: int = 0
+    strip_count: int = 0
+
+    strip_index_count: int = 0
+    list_index_count: int = 0 # Triangles saved as one strip per triangle
+
+    # Degenerate triangles in the strips once joined into one strip, as a renderer would.
+    degenerate_count: int = 0
+
+    # Average cache miss ratios (misses per triangle), keyed by cache size.
+    strip_acmr: Dict[int, float] = field(default_factory=dict)
+    list_acmr: Dict[int, float] = field(default_factory=dict)
+
+    # True if the triangle list was cheaper and saved in the STRP chunk instead of the strips.
+    uses_triangle_list: bool = False
+
+    @property
+    def average_strip_length(self) -> float:
+        """ Average number of triangles in a strip. """
+
+        return self.triangle_count / self.strip_count if self.strip_count else 0.0
+
+def count_vertex_cache_misses(indices: Iterable[int], cache_size: int) -> int:
+    """ Counts the misses in a simulated FIFO post-transform vertex cache. """
+
+    cache = deque()
+    contents = set()
+    misses = 0
+
+    for index in indices:
+        if index in contents:
+            continue
+
+        misses += 1
+        cache.append(index)
+        contents.add(index)
+
+        if len(cache) > cache_size:
+            contents.discard(cache.popleft())
+
+    return misses
+
+def join_triangle_strips(strips: List[List[int]]) -> List[int]:
+    """ Joins strips into one by repeating indices between them, keeping each
+        strip starting at an even position so its winding is preserved. """
+
+    joined: List[int] = []
+
+    for strip in strips:
+        if joined:
+            joined.append(joined[-1])
+            joined.append(strip[0])
+
+            if len(joined) % 2 == 1:
+                joined.append(strip[0])
+
+        joined.extend(strip)
+
+    return joined
+
+def count_degenerate_triangles(strip: List[int]) -> int:
+    """ Counts the triangles in a strip that use the same index more than once. """
+
+    return sum(1 for i in range(len(strip) - 2)
+               if strip[i] == strip[i + 1] or strip[i + 1] == strip[i + 2] or strip[i] == strip[i + 2])
+
+def create_segment_strip_statistics(triangles: List[List[int]], strips: List[List[int]],
+                                    model_name: str = "", material_name: str = "") -> SegmentStripStatistics:
+    """ Computes the statistics for a segment's triangles and the strips generated from them. """
+
+    list_indices = [index for triangle in triangles for index in triangle]
+    strip_indices = [index for strip in strips for index in strip]
+
+    stats = SegmentStripStatistics(model_name=model_name, material_name=material_name)
+
+    stats.triangle_count = len(triangles)
+    stats.strip_count = len(strips)
+    stats.strip_index_count = len(strip_indices)
+    stats.list_index_count = len(list_indices)
+    stats.degenerate_count = count_degenerate_triangles(join_triangle_strips(strips))
+
+    for cache_size in REPORT_VERTEX_CACHE_SIZES:
+        stats.strip_acmr[cache_size] = _get_acmr(strip_indices, cache_size, len(triangles))
+        stats.list_acmr[cache_size] = _get_acmr(list_indices, cache_size, len(triangles))
+
+    return stats
+
+def get_index_cost(misses: int, index_count: int) -> float:
+    """ Estimates the cost of drawing indices from their simulated vertex cache misses and their
+        count, so a few saved misses don't outweigh a lot more indices. """
+
+    return misses + INDEX_COST * index_count
+
+def is_triangle_list_cheaper(triangles: List[List[int]], strips: List[List[int]], cache_size: int) -> bool:
+    """ Checks if saving the triangles as one strip per triangle would cost less than the strips,
+        as estimated by get_index_cost. """
+
+    strip_cost = get_index_cost(count_vertex_cache_misses((index for strip in strips for index in strip), cache_size),
+                                sum(len(strip) for strip in strips))
+    list_cost = get_index_cost(count_vertex_cache_misses((index for triangle in triangles for index in triangle), cache_size),
+                               len(triangles) * 3)
+
+    return list_cost < strip_cost
+
+def format_strip_statistics(stats: List[SegmentStripStatistics]) -> str:
+    """ Formats statistics as a plain text report, one block per segment and then totals. """
+
+    lines: List[str] = []
+
+    def format_acmr(acmr: Dict[int, float]) -> str:
+        return "/".join("{:.3f}".format(acmr[cache_size]) for cache_size in REPORT_VERTEX_CACHE_SIZES)
+
+    cache_sizes = "/".join(str(cache_size) for cache_size in REPORT_VERTEX_CACHE_SIZES)
+
+    for segment in stats:
+        lines.append("{} [{}]".format(segment.model_name, segment.material_name))
+        lines.append("  triangles: {}  strips: {}  average strip length: {:.2f}  degenerates when joined: {}".format(
+                     segment.triangle_count, segment.strip_count, segment.average_strip_length, segment.degenerate_count))
+        lines.append("  indices: {} strips, {} list".format(segment.strip_index_count, segment.list_index_count))
+        lines.append("  ACMR ({}): {} strips, {} list".format(cache_sizes, format_acmr(segment.strip_acmr), format_acmr(segment.list_acmr)))
+        lines.append("  saved as: {}".format("triangle list" if segment.uses_triangle_list else "triangle strips"))
+
+    total_triangles = sum(segment.triangle_count for segment in stats)
+    total_strip_indices = sum(segment.strip_index_count for segment in stats)
+    total_list_indices = sum(segment.list_index_count for segment in stats)
+    list_segments = sum(1 for segment in stats if segment.uses_triangle_list)
+
+    lines.append("Total: {} segments, {} triangles, {} strip indices, {} list indices, {} segments saved as triangle lists".format(
+                 len(stats), total_triangles, total_strip_indices, total_list_indices, list_segments))
+
+    return "\n".join(lines)
+
+def _get_acmr(indices: List[int], cache_size: int, triangle_count: int) -> float:
+    if triangle_count == 0:
+        return 0.0
+
+    return count_vertex_cache_misses(indices, cache_size) / triangle_count
@@ -1,7 +1,7 @@
 """ Misc utilities. """
 
-from mathutils import Vector
-from typing import List
+from .msh_math import Vector
+from typing import List, Sequence
 
 
 def vec_to_str(vec):
@@ -45,3 +45,34 @@ def unpack_color(color: int) -> List[float]:
     a = (color >> 24 & 0xFF) / 255.0
 
     return [r,g,b,a]
+
+def encode_triangle_strips(strips: List[List[int]]) -> List[int]:
+    """ Concatenates strips as in a 'STRP' section, marking the first two
+        indices of each as the start of a strip. """
+
+    encoded: List[int] = []
+
+    for strip in strips:
+        encoded.append(strip[0] | 0x8000)
+        encoded.append(strip[1] | 0x8000)
+        encoded.extend(strip[2:])
+
+    return encoded
+
+def decode_triangle_strips(indices: Sequence[int]) -> List[List[int]]:
+    """ Splits indices encoded as in a 'STRP' section back into strips. """
+
+    num_indices = len(indices)
+
+    strip_starts = [i for i in range(num_indices - 1) if indices[i] & 0x8000 > 0 and indices[i+1] & 0x8000 > 0]
+    strip_starts.append(num_indices)
+
+    strips: List[List[int]] = []
+
+    for i in range(len(strip_starts) - 1):
+        start = strip_starts[i]
+        end = strip_starts[i+1]
+
+        strips.append([indices[start] & 0x7fff, indices[start+1] & 0x7fff] + list(indices[start+2 : end]))
+
+    return strips
@@ -1,19 +1,36 @@
-
 import io
 import struct
+import sys
+
+from array import array
 
 class Writer:
-    def __init__(self, file, chunk_id: str, parent=None):
+    """ Writes a chunk and, through create_child, its children.
+
+        With buffered=True the whole file is built in memory: chunk sizes are patched
+        into the buffer when each chunk ends and the root chunk writes the result to
+        file with a single write instead of seeking back for every chunk. """
+
+    def __init__(self, file, chunk_id: str, parent=None, buffered: bool = False):
         self.file = file
         self.size: int = 0
         self.size_pos = None
         self.parent = parent
 
-        self.file.write(bytes(chunk_id[0:4], "ascii"))
+        if parent is not None:
+            self.buffer = parent.buffer
+        else:
+            self.buffer = bytearray() if buffered else None
+
+        self._write_raw(bytes(chunk_id[0:4], "ascii"))
 
     def __enter__(self):
-        self.size_pos = self.file.tell()
-        self.file.write(struct.pack(f"<I", 0))
+        if self.buffer is not None:
+            self.size_pos = len(self.buffer)
+        else:
+            self.size_pos = self.file.tell()
+
+        self._write_raw(struct.pack(f"<I", 0))
 
         return self
 
@@ -23,19 +40,31 @@ class Writer:
 
         if (self.size % 4) > 0:
             padding = 4 - (self.size % 4)
-            self.write_bytes(bytes([0 for i in range(padding)]))
+            self.write_bytes(bytes(padding))
+
+        if self.buffer is not None:
+            struct.pack_into(f"<I", self.buffer, self.size_pos, self.size)
 
-        head_pos = self.file.tell()
-        self.file.seek(self.size_pos)
-        self.file.write(struct.pack(f"<I", self.size))
-        self.file.seek(head_pos)
+            if self.parent is None and exc_type is None:
+                self.file.write(self.buffer)
+        else:
+            head_pos = self.file.tell()
+            self.file.seek(self.size_pos)
+            self.file.write(struct.pack(f"<I", self.size))
+            self.file.seek(head_pos)
 
         if self.parent is not None:
             self.parent.size += self.size
 
+    def _write_raw(self, packed_bytes):
+        if self.buffer is not None:
+            self.buffer += packed_bytes
+        else:
+            self.file.write(packed_bytes)
+
     def write_bytes(self, packed_bytes):
         self.size += len(packed_bytes)
-        self.file.write(packed_bytes)
+        self._write_raw(packed_bytes)
 
     def write_string(self, string: str):
         self.write_bytes(bytes(string, "utf-8"))
@@ -62,6 +91,46 @@ class Writer:
     def write_f32(self, *floats):
         self.write_bytes(struct.pack(f"<{len(floats)}f", *floats))
 
+    def write_array(self, typecode: str, values):
+        """ Writes values as a single block of little-endian values of the supplied
+            array.array typecode.
+
+            values can be an array.array, any other contiguous buffer with a matching item
+            type (memoryview, NumPy array, ...) or an iterable of numbers. """
+
+        if not isinstance(values, array) or values.typecode != typecode:
+            try:
+                view = memoryview(values)
+            except TypeError:
+                view = None
+
+            if view is not None and view.c_contiguous and view.format.lstrip("<=@") == typecode:
+                buffer = array(typecode)
+                buffer.frombytes(view.cast("B"))
+                values = buffer
+            else:
+                values = array(typecode, values)
+
+        if sys.byteorder != "little":
+            values = array(typecode, values)
+            values.byteswap()
+
+        self.write_bytes(values.tobytes())
+
+    def write_u16_array(self, values):
+        self.write_array("H", values)
+
+    def write_u32_array(self, values):
+        self.write_array("I", values)
+
+    def write_f32_array(self, values):
+        self.write_array("f", values)
+
+    def write_chunk(self, chunk: bytes):
+        """ Writes a complete chunk, serialized by a separate root Writer, as a child of this one. """
+
+        self.write_bytes(chunk)
+
     def create_child(self, child_id: str):
         child = Writer(self.file, chunk_id=child_id, parent=self)
         self.size += 8
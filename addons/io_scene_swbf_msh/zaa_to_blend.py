@@ -8,6 +8,7 @@ dataclass instead of returning a convoluted nested dict.
 
 import os
 import bpy
+from mathutils import Matrix
 import re
 
 from .chunked_file_reader import Reader
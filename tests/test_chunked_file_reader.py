@@ -0,0 +1,90 @@
+""" Tests for skipping chunks and resyncing after padding or garbage in chunked_file_reader. """
+
+import io
+import os
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.chunked_file_reader import Reader
+from io_scene_swbf_msh.chunked_file_index import index_chunks
+
+
+def create_chunk(header: bytes, payload: bytes) -> bytes:
+    return header + struct.pack("<I", len(payload)) + payload
+
+
+def read_child_headers(data: bytes):
+    headers = []
+
+    with Reader(io.BytesIO(data)) as root:
+        while root.could_have_child():
+            if root.next_chunk_fits():
+                with root.read_child() as child:
+                    headers.append((child.header, child.size_pos))
+            else:
+                root.skip_chunk()
+
+    return headers
+
+
+class TestReaderResync(unittest.TestCase):
+
+    def test_skips_padding_between_chunks(self):
+        first = create_chunk(b"POSL", b"\x01" * 12)
+        second = create_chunk(b"NRML", b"\x02" * 12)
+        data = first + b"\0\0\0" + second
+
+        self.assertEqual(read_child_headers(data), [("POSL", 0), ("NRML", len(first) + 3)])
+
+    def test_skips_header_like_bytes_whose_size_does_not_fit(self):
+        # Misaligned payload that looks like a header, with a size reaching past the end of the file.
+        garbage = b"\x07AB" + b"NAME" + struct.pack("<I", 0x7fff0000) + b"\x09"
+        second = create_chunk(b"NRML", b"\x02" * 12)
+        data = garbage + second
+
+        self.assertEqual(read_child_headers(data), [("NRML", len(garbage))])
+
+    def test_skips_many_header_like_bytes(self):
+        # Upper case text, every position of which matches the header pattern.
+        garbage = b"\x01" + b"ABCDEFGHIJKLMNOPQRSTUVWXYZ" * 4
+        second = create_chunk(b"NRML", b"\x02" * 12)
+        data = garbage + second
+
+        self.assertEqual(read_child_headers(data), [("NRML", len(garbage))])
+
+    def test_resync_stops_only_at_a_header_whose_size_fits(self):
+        garbage = b"\x07" + b"NAME" + struct.pack("<I", 0x7fff0000) + b"TEXTURE_"
+        second = create_chunk(b"NRML", b"\x02" * 12)
+        data = garbage + second
+
+        with Reader(io.BytesIO(data)) as root:
+            root.resync()
+
+            self.assertEqual(root.get_current_pos(), len(garbage))
+
+    def test_resync_moves_to_end_without_a_fitting_header(self):
+        data = b"\x01" + b"NAME" + struct.pack("<I", 100) + b"TAIL"
+
+        with Reader(io.BytesIO(data)) as root:
+            root.resync()
+
+            self.assertEqual(root.get_current_pos(), len(data))
+
+    def test_index_skips_garbage(self):
+        garbage = b"\x07" + b"NAME" + struct.pack("<I", 0x7fff0000)
+        first = create_chunk(b"POSL", b"\x01" * 12)
+        second = create_chunk(b"NRML", b"\x02" * 12)
+        data = first + garbage + second
+
+        with Reader(io.BytesIO(data)) as root:
+            index = index_chunks(root)
+
+        self.assertEqual([entry.path for entry in index], ["POSL[0]", "NRML[0]"])
+        self.assertEqual(index.find("NRML").offset, len(first) + len(garbage))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+""" Tests for dropping entries from the in-memory export cache in msh_export_cache. """
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.msh_export_cache import ExportCache
+from io_scene_swbf_msh.msh_math import Vector
+from io_scene_swbf_msh.msh_model import GeometrySegment
+
+
+def create_geometry(vertex_count: int):
+    segment = GeometrySegment()
+    segment.positions = [Vector((float(i), 0.0, 0.0)) for i in range(vertex_count)]
+    segment.triangles = [[i, i + 1, i + 2] for i in range(vertex_count - 2)]
+
+    return [segment]
+
+
+class TestExportCache(unittest.TestCase):
+
+    def test_store_drops_models_previous_entry(self):
+        cache = ExportCache()
+
+        cache.store_geometry("box", "old", create_geometry(8))
+        cache.store_segm_chunks("old", (0,), [b"SEGM"])
+        cache.store_geometry("box", "new", create_geometry(8))
+
+        self.assertIsNone(cache.get_geometry("old"))
+        self.assertIsNone(cache.get_segm_chunks("old", (0,)))
+        self.assertIsNotNone(cache.get_geometry("new"))
+
+    def test_store_keeps_entry_used_by_another_model(self):
+        cache = ExportCache()
+
+        cache.store_geometry("box", "shared", create_geometry(8))
+        cache.store_geometry("box.001", "shared", create_geometry(8))
+        cache.store_geometry("box", "new", create_geometry(8))
+
+        self.assertIsNotNone(cache.get_geometry("shared"))
+
+        cache.store_geometry("box.001", "new", create_geometry(8))
+
+        self.assertIsNone(cache.get_geometry("shared"))
+
+    def test_store_drops_least_recently_used_beyond_max_bytes(self):
+        probe = ExportCache()
+        probe.store_geometry("probe", "probe", create_geometry(100))
+
+        cache = ExportCache(max_bytes=probe._total_bytes * 3)
+
+        for name in ("a", "b", "c"):
+            cache.store_geometry(name, name, create_geometry(100))
+
+        cache.get_geometry("a")
+        cache.store_geometry("d", "d", create_geometry(100))
+
+        self.assertIsNone(cache.get_geometry("b"))
+
+        for name in ("a", "c", "d"):
+            self.assertIsNotNone(cache.get_geometry(name))
+
+        self.assertLessEqual(cache._total_bytes, cache.max_bytes)
+
+    def test_clear_resets_size(self):
+        cache = ExportCache()
+
+        cache.store_geometry("box", "box", create_geometry(8))
+        cache.store_segm_chunks("box", (0,), [b"SEGM"])
+        cache.clear()
+
+        self.assertEqual(cache._total_bytes, 0)
+        self.assertIsNone(cache.get_geometry("box"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+""" Tests for telling exceptions of the mapped function apart from pool failures in msh_process_pool. """
+
+import os
+import sys
+import unittest
+
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh import msh_process_pool
+from io_scene_swbf_msh.msh_process_pool import map_in_pool, create_process_pool
+
+
+class TestMapInPool(unittest.TestCase):
+
+    def setUp(self):
+        msh_process_pool._pool_failed = False
+
+        cpu_count = mock.patch.object(msh_process_pool.os, "cpu_count", return_value=2)
+        cpu_count.start()
+        self.addCleanup(cpu_count.stop)
+        self.addCleanup(setattr, msh_process_pool, "_pool_failed", False)
+
+    def test_results_are_in_order(self):
+        self.assertEqual(list(map_in_pool(len, [b"a", b"abc", b"ab"], [1, 3, 2])), [1, 3, 2])
+        self.assertFalse(msh_process_pool._pool_failed)
+
+    def test_exception_from_fn_is_raised_from_worker(self):
+        with self.assertRaises(ValueError) as context:
+            list(map_in_pool(int, ["1", "x", "3"]))
+
+        # Raised by the worker, not by running the item again in this process.
+        self.assertIsInstance(context.exception.__cause__, msh_process_pool._RemoteTraceback)
+        self.assertFalse(msh_process_pool._pool_failed)
+
+    def test_pool_failure_falls_back_and_is_remembered(self):
+        # A memoryview can't be pickled to send it to a worker.
+        items = [b"ab", memoryview(b"abc"), b"a"]
+
+        self.assertEqual(list(map_in_pool(len, items)), [2, 3, 1])
+        self.assertTrue(msh_process_pool._pool_failed)
+        self.assertIsNone(create_process_pool(4))
+
+
+if __name__ == "__main__":
+    unittest.main()
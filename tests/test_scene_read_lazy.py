@@ -0,0 +1,85 @@
+""" Tests for reading geometry lazily with read_scene(..., lazy=True) in msh_scene_read. """
+
+import copy
+import io
+import os
+import pickle
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.msh_model import GeometrySegment
+from io_scene_swbf_msh.msh_scene_read import read_scene, LazyScene, LazyGeometrySegment
+
+
+def create_chunk(header: bytes, payload: bytes) -> bytes:
+    return header + struct.pack("<I", len(payload)) + payload
+
+
+def create_msh() -> bytes:
+    matd = create_chunk(b"MATD", create_chunk(b"NAME", b"material\0"))
+    matl = create_chunk(b"MATL", struct.pack("<I", 1) + matd)
+
+    posl = create_chunk(b"POSL", struct.pack("<I", 3) + struct.pack("<9f", 0, 0, 0, 1, 0, 0, 0, 1, 0))
+    ndxt = create_chunk(b"NDXT", struct.pack("<I", 1) + struct.pack("<3H", 0, 1, 2))
+    segm = create_chunk(b"SEGM", create_chunk(b"MATI", struct.pack("<I", 0)) + posl + ndxt)
+
+    modl = create_chunk(b"MODL", create_chunk(b"MTYP", struct.pack("<I", 0)) +
+                                 create_chunk(b"NAME", b"model\0") +
+                                 create_chunk(b"GEOM", segm))
+
+    return create_chunk(b"HEDR", create_chunk(b"MSH2", matl + modl))
+
+
+def read_lazy_scene() -> LazyScene:
+    return read_scene(io.BytesIO(create_msh()), lazy=True)
+
+
+class TestLazyRead(unittest.TestCase):
+
+    def test_fields_are_read_on_access(self):
+        with read_lazy_scene() as scene:
+            segment = scene.models[0].geometry[0]
+
+            self.assertIsInstance(segment, LazyGeometrySegment)
+            self.assertEqual(set(segment.pending_chunks), {"positions", "triangles"})
+            self.assertEqual(segment.triangles, [(0, 1, 2)])
+            self.assertEqual(set(segment.pending_chunks), {"positions"})
+            self.assertEqual(segment.material_name, "material")
+
+    def test_pending_chunks_are_per_instance(self):
+        with read_lazy_scene() as scene:
+            segment = scene.models[0].geometry[0]
+            segment_copy = copy.copy(segment)
+
+            self.assertIsNot(segment_copy.pending_chunks, segment.pending_chunks)
+            self.assertEqual(segment_copy.positions[1], (1.0, 0.0, 0.0))
+            self.assertIn("positions", segment.pending_chunks)
+
+            self.assertEqual(LazyGeometrySegment().pending_chunks, {})
+            self.assertIsNot(LazyGeometrySegment().pending_chunks, LazyGeometrySegment().pending_chunks)
+
+    def test_pickles_as_read_segment(self):
+        with read_lazy_scene() as scene:
+            segment = pickle.loads(pickle.dumps(scene.models[0].geometry[0]))
+
+        self.assertIs(type(segment), GeometrySegment)
+        self.assertEqual(segment.triangles, [(0, 1, 2)])
+        self.assertEqual(len(segment.positions), 3)
+
+    def test_close_releases_file(self):
+        scene = read_lazy_scene()
+        segment = scene.models[0].geometry[0]
+
+        scene.close()
+
+        self.assertIsNone(scene.mapped_file)
+
+        with self.assertRaises(ValueError):
+            segment.positions
+
+
+if __name__ == "__main__":
+    unittest.main()
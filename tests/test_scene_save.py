@@ -0,0 +1,52 @@
+""" Tests for writing vertex chunks from NumPy arrays in msh_scene_save. """
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.msh_model import GeometrySegment
+from io_scene_swbf_msh.msh_scene_save import _serialize_segm
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def create_segment(positions, normals, texcoords) -> GeometrySegment:
+    return GeometrySegment(material_name="material", positions=positions, normals=normals, texcoords=texcoords,
+                           polygons=[[0, 1, 2]], triangles=[[0, 1, 2]], triangle_strips=[[0, 1, 2]])
+
+
+@unittest.skipIf(numpy is None, "NumPy isn't installed")
+class TestSerializeNumpySegment(unittest.TestCase):
+
+    def setUp(self):
+        self.positions = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.5), (0.0, 1.0, 0.25)]
+        self.normals = [(0.0, 0.0, 1.0)] * 3
+        self.texcoords = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)]
+
+        self.expected = _serialize_segm(create_segment(self.positions, self.normals, self.texcoords), {"material": 0})
+
+    def test_float64_arrays(self):
+        segment = create_segment(numpy.array(self.positions, dtype=numpy.float64),
+                                 numpy.array(self.normals, dtype=numpy.float64),
+                                 numpy.array(self.texcoords, dtype=numpy.float64))
+
+        self.assertEqual(_serialize_segm(segment, {"material": 0}), self.expected)
+
+    def test_float32_and_non_contiguous_arrays(self):
+        padded_positions = numpy.zeros((3, 4), dtype=numpy.float32)
+        padded_positions[:, :3] = self.positions
+
+        segment = create_segment(padded_positions[:, :3],
+                                 numpy.array(self.normals, dtype=numpy.float32),
+                                 numpy.asfortranarray(numpy.array(self.texcoords, dtype=numpy.float32)))
+
+        self.assertEqual(_serialize_segm(segment, {"material": 0}), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
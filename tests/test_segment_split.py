@@ -0,0 +1,91 @@
+""" Tests for splitting segments with too many vertices and removing degenerate triangles in msh_model_utilities. """
+
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.msh_model import GeometrySegment
+from io_scene_swbf_msh.msh_model_utilities import split_segment, remove_degenerate_triangles
+
+
+def create_hexagons_segment(columns: int, rows: int) -> GeometrySegment:
+    """ A grid of separate hexagons, each a polygon of six vertices cut into a fan of four triangles. """
+
+    segment = GeometrySegment(material_name="material")
+
+    for row in range(rows):
+        for column in range(columns):
+            first = len(segment.positions)
+
+            for corner in range(6):
+                angle = math.pi / 3.0 * corner
+                segment.positions.append((column * 3.0 + math.cos(angle), 0.0, row * 3.0 + math.sin(angle)))
+
+            segment.polygons.append(list(range(first, first + 6)))
+            segment.triangles += [[first, first + i, first + i + 1] for i in range(1, 5)]
+
+    segment.normals = [(0.0, 1.0, 0.0)] * len(segment.positions)
+    segment.texcoords = [(position[0], position[2]) for position in segment.positions]
+
+    return segment
+
+
+class TestSplitSegment(unittest.TestCase):
+
+    def test_polygons_stay_whole(self):
+        segment = create_hexagons_segment(12, 12)
+        parts = split_segment(segment, 50)
+
+        self.assertGreater(len(parts), 1)
+
+        for part in parts:
+            self.assertLessEqual(len(part.positions), 50)
+            self.assertEqual(len(part.normals), len(part.positions))
+
+            polygon_sets = [frozenset(polygon) for polygon in part.polygons]
+            polygon_triangle_counts = dict.fromkeys(polygon_sets, 0)
+
+            for triangle in part.triangles:
+                polygon = next(polygon for polygon in polygon_sets if polygon.issuperset(triangle))
+                polygon_triangle_counts[polygon] += 1
+
+            for polygon in part.polygons:
+                self.assertEqual(polygon_triangle_counts[frozenset(polygon)], len(polygon) - 2)
+
+        self.assertEqual(sum(len(part.polygons) for part in parts), len(segment.polygons))
+        self.assertEqual(sum(len(part.triangles) for part in parts), len(segment.triangles))
+
+    def test_triangles_are_kept(self):
+        segment = create_hexagons_segment(8, 5)
+        parts = split_segment(segment, 40)
+
+        def get_triangle_positions(part):
+            return [tuple(part.positions[index] for index in triangle) for triangle in part.triangles]
+
+        self.assertEqual(sorted(triangle for part in parts for triangle in get_triangle_positions(part)),
+                         sorted(get_triangle_positions(segment)))
+
+    def test_small_segment_is_not_split(self):
+        segment = create_hexagons_segment(2, 2)
+
+        self.assertEqual(split_segment(segment, 100), [segment])
+
+
+class TestRemoveDegenerateTriangles(unittest.TestCase):
+
+    def test_welded_corners(self):
+        # A quad whose last two corners were welded together, next to an untouched triangle.
+        segment = GeometrySegment(triangles=[[0, 1, 2], [0, 2, 2], [2, 1, 3], [3, 3, 3]],
+                                  polygons=[[0, 1, 2, 2], [2, 1, 3], [3, 3, 3, 3], [0, 4, 0, 4]])
+
+        remove_degenerate_triangles(segment)
+
+        self.assertEqual(segment.triangles, [[0, 1, 2], [2, 1, 3]])
+        self.assertEqual(segment.polygons, [[0, 1, 2], [2, 1, 3]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+""" Tests for pruning the on-disk triangle strip cache in msh_strip_cache. """
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.msh_strip_cache import TriangleStripCache, STRIP_CACHE_VERSION
+
+
+class TestTriangleStripCachePrune(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = TriangleStripCache(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def store(self, triangle_count: int, mtime: float) -> str:
+        triangles = [[i, i + 1, i + 2] for i in range(triangle_count)]
+        key = self.cache.get_key(triangles, "fast")
+
+        self.cache.store(key, triangles)
+        os.utime(self.cache._get_path(key), (mtime, mtime))
+
+        return key
+
+    def test_removes_least_recently_used_entries_beyond_max_bytes(self):
+        now = time.time()
+        oldest = self.store(100, now - 300)
+        middle = self.store(101, now - 200)
+        newest = self.store(102, now - 100)
+
+        entry_size = os.path.getsize(self.cache._get_path(newest))
+
+        self.cache.prune(max_bytes=entry_size * 2)
+
+        self.assertIsNone(self.cache.load(oldest))
+        self.assertIsNotNone(self.cache.load(middle))
+        self.assertIsNotNone(self.cache.load(newest))
+
+    def test_load_marks_entries_as_recently_used(self):
+        now = time.time()
+        first = self.store(100, now - 300)
+        second = self.store(101, now - 200)
+
+        self.assertIsNotNone(self.cache.load(first))
+
+        self.cache.prune(max_bytes=os.path.getsize(self.cache._get_path(first)))
+
+        self.assertIsNotNone(self.cache.load(first))
+        self.assertIsNone(self.cache.load(second))
+
+    def test_removes_other_versions_and_keeps_unrelated_files(self):
+        old_version_dir = os.path.join(self.temp_dir.name, f"v{STRIP_CACHE_VERSION - 1}", "ab")
+        unversioned_dir = os.path.join(self.temp_dir.name, "cd")
+        unrelated_path = os.path.join(self.temp_dir.name, "notes.txt")
+
+        os.makedirs(old_version_dir)
+        os.makedirs(unversioned_dir)
+
+        for directory in (old_version_dir, unversioned_dir):
+            with open(os.path.join(directory, "0" * 40), "wb") as entry_file:
+                entry_file.write(b"\0" * 8)
+
+        with open(unrelated_path, "w") as unrelated_file:
+            unrelated_file.write("not part of the cache")
+
+        key = self.store(10, time.time())
+
+        self.cache.prune()
+
+        self.assertFalse(os.path.exists(os.path.dirname(old_version_dir)))
+        self.assertFalse(os.path.exists(unversioned_dir))
+        self.assertTrue(os.path.exists(unrelated_path))
+        self.assertIsNotNone(self.cache.load(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+""" Tests for keeping the overdraw order of msh_model_triangle_order through triangle strip generation. """
+
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "addons"))
+
+from io_scene_swbf_msh.msh_model import GeometrySegment, Model, ModelType
+from io_scene_swbf_msh.msh_model_triangle_order import reorder_models_triangles_for_overdraw
+from io_scene_swbf_msh.msh_model_triangle_strips import create_models_triangle_strips, create_segment_triangle_strips
+
+
+def create_sphere_segment(rings: int, sectors: int) -> GeometrySegment:
+    segment = GeometrySegment()
+
+    for ring in range(rings + 1):
+        theta = math.pi * ring / rings
+
+        for sector in range(sectors):
+            phi = 2.0 * math.pi * sector / sectors
+            normal = (math.sin(theta) * math.cos(phi), math.sin(theta) * math.sin(phi), math.cos(theta))
+
+            segment.positions.append(normal)
+            segment.normals.append(normal)
+
+    for ring in range(rings):
+        for sector in range(sectors):
+            a = ring * sectors + sector
+            b = ring * sectors + (sector + 1) % sectors
+            c = a + sectors
+            d = b + sectors
+
+            segment.triangles += [[a, c, b], [b, c, d]]
+
+    segment.polygons = [list(triangle) for triangle in segment.triangles]
+
+    return segment
+
+
+def get_strip_triangles(strips):
+    """ The triangles of strips in the order they are drawn, as vertex sets. """
+
+    return [frozenset(strip[i:i + 3]) for strip in strips for i in range(len(strip) - 2)]
+
+
+class TestStripsKeepClusterOrder(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Model(name="sphere", model_type=ModelType.STATIC, geometry=[create_sphere_segment(12, 16)])
+
+        reorder_models_triangles_for_overdraw([self.model], cache_size=16)
+
+        self.segment = self.model.geometry[0]
+
+        self.triangle_clusters = {}
+
+        cluster_ends = self.segment.triangle_clusters[1:] + [len(self.segment.triangles)]
+
+        for cluster, (start, end) in enumerate(zip(self.segment.triangle_clusters, cluster_ends)):
+            for triangle in self.segment.triangles[start:end]:
+                self.triangle_clusters[frozenset(triangle)] = cluster
+
+    def assert_follows_clusters(self, strips):
+        strip_triangles = get_strip_triangles(strips)
+
+        self.assertEqual(sorted(map(sorted, strip_triangles)), sorted(map(sorted, self.triangle_clusters)))
+
+        clusters = [self.triangle_clusters[triangle] for triangle in strip_triangles]
+
+        self.assertEqual(clusters, sorted(clusters))
+
+    def test_reorder_records_clusters(self):
+        self.assertGreater(len(self.segment.triangle_clusters), 1)
+        self.assertEqual(self.segment.triangle_clusters[0], 0)
+
+    def test_fast_strips_follow_clusters(self):
+        self.assert_follows_clusters(create_segment_triangle_strips(self.segment.triangles, False, 16,
+                                                                    self.segment.triangle_clusters))
+
+    def test_vertex_cache_strips_follow_clusters(self):
+        self.assert_follows_clusters(create_segment_triangle_strips(self.segment.triangles, True, 16,
+                                                                    self.segment.triangle_clusters))
+
+    def test_model_strips_follow_clusters(self):
+        create_models_triangle_strips([self.model], optimize_for_vertex_cache=True, vertex_cache_size=16)
+
+        self.assert_follows_clusters(self.segment.triangle_strips)
+
+
+if __name__ == "__main__":
+    unittest.main()